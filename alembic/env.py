@@ -16,6 +16,7 @@ from configs.config import settings
 from database import Base
 from auth.models import *  # noqa: F403
 from wallets.models import *  # noqa: F403
+from outbox.models import *  # noqa: F403
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -34,6 +35,15 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 target_metadata = Base.metadata
 
+# Tables that exist only in the database and must not be dropped by autogenerate,
+# wallets_invalid_address holds rows quarantined by the binary address migration
+UNMANAGED_TABLES = {"wallets_invalid_address"}
+
+
+def include_object(object, name, type_, reflected, compare_to) -> bool:
+    return not (type_ == "table" and reflected and name in UNMANAGED_TABLES)
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -56,6 +66,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -65,7 +76,11 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_object=include_object,
+    )
 
     with context.begin_transaction():
         context.run_migrations()
@@ -0,0 +1,132 @@
+"""wallets binary address
+
+Revision ID: 2b9f6a1e7c48
+Revises: 7e0b3d9c26fa
+Create Date: 2026-10-19 18:24:53.760915
+
+"""
+
+import logging
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from eth_utils import to_checksum_address
+
+
+# revision identifiers, used by Alembic.
+revision: str = "2b9f6a1e7c48"
+down_revision: Union[str, None] = "7e0b3d9c26fa"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+logger = logging.getLogger(f"alembic.runtime.migration.{revision}")
+
+CHECKSUM_BATCH_SIZE = 1000
+
+# Rows that cannot be converted to 20 bytes, or that collide with an earlier
+# row once the case of the hex digits stops mattering
+INVALID_WALLETS = """
+    SELECT id FROM wallets WHERE address !~ '^0x[0-9a-fA-F]{40}$'
+    UNION
+    SELECT id FROM (
+        SELECT id, row_number() OVER (PARTITION BY lower(address) ORDER BY id) AS position
+        FROM wallets
+    ) AS duplicates
+    WHERE position > 1
+"""
+
+wallets = sa.table(
+    "wallets",
+    sa.column("id", sa.Integer()),
+    sa.column("address_bytes", sa.LargeBinary(20)),
+    sa.column("checksum_address", sa.String(42)),
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "wallets_invalid_address",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("number", sa.Integer(), nullable=False),
+        sa.Column("address", sa.String(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("group_id", sa.Integer(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+    connection = op.get_bind()
+    quarantined = connection.execute(
+        sa.text(
+            f"""
+            WITH moved AS (
+                DELETE FROM wallets
+                WHERE id IN ({INVALID_WALLETS})
+                RETURNING id, number, address, user_id, group_id
+            )
+            INSERT INTO wallets_invalid_address (id, number, address, user_id, group_id)
+            SELECT id, number, address, user_id, group_id FROM moved
+            RETURNING id, address
+            """
+        )
+    ).all()
+    for wallet_id, address in quarantined:
+        logger.warning(
+            "Wallet %s with address %r moved to wallets_invalid_address",
+            wallet_id,
+            address,
+        )
+
+    op.add_column(
+        "wallets", sa.Column("address_bytes", sa.LargeBinary(length=20), nullable=True)
+    )
+    op.add_column(
+        "wallets", sa.Column("checksum_address", sa.String(length=42), nullable=True)
+    )
+    op.execute("UPDATE wallets SET address_bytes = decode(substr(address, 3), 'hex')")
+
+    # EIP-55 needs keccak, so checksums are computed here and written in batches
+    rows = connection.execute(sa.select(wallets.c.id, wallets.c.address_bytes)).all()
+    update_checksum = (
+        wallets.update()
+        .where(wallets.c.id == sa.bindparam("wallet_id"))
+        .values(checksum_address=sa.bindparam("checksum"))
+    )
+    for offset in range(0, len(rows), CHECKSUM_BATCH_SIZE):
+        connection.execute(
+            update_checksum,
+            [
+                {"wallet_id": wallet_id, "checksum": to_checksum_address(address_bytes)}
+                for wallet_id, address_bytes in rows[
+                    offset : offset + CHECKSUM_BATCH_SIZE
+                ]
+            ],
+        )
+
+    op.drop_constraint("wallets_address_key", "wallets", type_="unique")
+    op.drop_column("wallets", "address")
+    op.alter_column(
+        "wallets", "address_bytes", new_column_name="address", nullable=False
+    )
+    op.alter_column("wallets", "checksum_address", nullable=False)
+    op.create_unique_constraint("wallets_address_key", "wallets", ["address"])
+
+
+def downgrade() -> None:
+    op.drop_constraint("wallets_address_key", "wallets", type_="unique")
+    op.alter_column("wallets", "address", new_column_name="address_bytes")
+    op.add_column("wallets", sa.Column("address", sa.String(), nullable=True))
+    op.execute("UPDATE wallets SET address = checksum_address")
+    op.alter_column("wallets", "address", nullable=False)
+    op.drop_column("wallets", "checksum_address")
+    op.drop_column("wallets", "address_bytes")
+    op.create_unique_constraint("wallets_address_key", "wallets", ["address"])
+    op.execute(
+        """
+        INSERT INTO wallets (id, number, address, user_id, group_id)
+        SELECT id, number, address, user_id, group_id FROM wallets_invalid_address
+        ON CONFLICT DO NOTHING
+        """
+    )
+    op.drop_table("wallets_invalid_address")
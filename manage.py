@@ -33,6 +33,191 @@ async def runserver(port: int, host: str):
     uvicorn.run("main:app", host=host, port=port, reload=True)
 
 
+@main.command()
+@click.option(
+    "--messages",
+    type=int,
+    default=1000,
+    help="Number of messages to send in each mode (default: 1000)",
+)
+@click.option(
+    "--threads",
+    type=int,
+    default=200,
+    help="Threads submitting messages in async mode (default: 200)",
+)
+async def smtp_benchmark(messages: int, threads: int):
+    """
+    Compare sync and async email delivery throughput against the configured SMTP server
+    """
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    from email.message import EmailMessage
+
+    from auth.smtp import create_email_sender
+    from configs.config import settings
+
+    message = EmailMessage()
+    message["Subject"] = "Benchmark"
+    message["From"] = settings.email.SMTP_USER
+    message["To"] = settings.email.SMTP_USER
+    message.set_content("Benchmark")
+
+    for delivery_mode in ("sync", "async"):
+        sender = create_email_sender(delivery_mode)
+
+        start = time.perf_counter()
+
+        if delivery_mode == "sync":
+            # A prefork worker process sends one message at a time
+            for _ in range(messages):
+                sender.send_message(message)
+        else:
+            with ThreadPoolExecutor(max_workers=threads) as executor:
+                for future in [
+                    executor.submit(sender.send_message, message)
+                    for _ in range(messages)
+                ]:
+                    future.result()
+
+        elapsed = time.perf_counter() - start
+
+        sender.close_all()
+
+        click.echo(
+            f"{delivery_mode}: {messages} messages in {elapsed:.2f}s "
+            f"({messages / elapsed:.1f} msg/s)"
+        )
+
+
+@main.command()
+@click.option(
+    "--rows",
+    type=int,
+    multiple=True,
+    default=[10_000, 100_000],
+    help="Number of addresses per run, may be repeated (default: 10000 and 100000)",
+)
+async def address_validation_benchmark(rows: tuple[int, ...]):
+    """
+    Compare per-item Pydantic address validation with batch validation
+    """
+    import re
+    import secrets
+    import time
+    from typing import List
+
+    from eth_utils import is_checksum_address, to_checksum_address
+    from pydantic import BaseModel, TypeAdapter, validator
+
+    from wallets.utils import _checksum_address, validate_addresses
+
+    address_pattern = re.compile(r"^0x[a-fA-F0-9]{40}$")
+
+    class PerItemWalletSchema(BaseModel):
+        address: str
+
+        @validator("address")
+        def validate_address(cls, address: str) -> str:
+            if not address_pattern.match(address):
+                raise ValueError("Invalid wallet address format")
+
+            address_hex = address[2:]
+            if (
+                address_hex != address_hex.lower()
+                and address_hex != address_hex.upper()
+                and not is_checksum_address(address)
+            ):
+                raise ValueError("Invalid address checksum")
+
+            return address
+
+    per_item_adapter = TypeAdapter(List[PerItemWalletSchema])
+
+    for count in rows:
+        addresses = [to_checksum_address(secrets.token_bytes(20)) for _ in range(count)]
+        payload = [{"address": address} for address in addresses]
+
+        start = time.perf_counter()
+        per_item_adapter.validate_python(payload)
+        per_item_elapsed = time.perf_counter() - start
+
+        _checksum_address.cache_clear()
+
+        start = time.perf_counter()
+        validate_addresses(enumerate(addresses, start=1))
+        batch_elapsed = time.perf_counter() - start
+
+        # A repeated import of the same sheet hits the checksum cache
+        start = time.perf_counter()
+        validate_addresses(enumerate(addresses, start=1))
+        batch_warm_elapsed = time.perf_counter() - start
+
+        click.echo(
+            f"{count} rows: per-item {per_item_elapsed:.3f}s, "
+            f"batch {batch_elapsed:.3f}s, batch repeated {batch_warm_elapsed:.3f}s"
+        )
+
+
+@main.command()
+@click.option(
+    "--calls",
+    type=int,
+    default=10_000,
+    help="Number of balanceOf calls to encode and decode (default: 10000)",
+)
+async def erc20_encoding_benchmark(calls: int):
+    """
+    Compare web3 contract encoding of balanceOf with the raw ERC-20 encoder
+    """
+    import json
+    import secrets
+    import time
+
+    from eth_abi import decode as decode_abi
+    from eth_utils import to_checksum_address
+    from web3 import AsyncWeb3
+
+    from wallets.erc20 import decode_uint256, encode_balance_of
+
+    abi = json.dumps(
+        [
+            {
+                "constant": True,
+                "inputs": [{"name": "who", "type": "address"}],
+                "name": "balanceOf",
+                "outputs": [{"name": "", "type": "uint256"}],
+                "payable": False,
+                "stateMutability": "view",
+                "type": "function",
+            }
+        ]
+    )
+    web3 = AsyncWeb3()
+    contract_address = to_checksum_address(secrets.token_bytes(20))
+    wallet_addresses = [secrets.token_bytes(20) for _ in range(calls)]
+    checksum_addresses = [to_checksum_address(address) for address in wallet_addresses]
+    result = (10**18).to_bytes(32, "big")
+
+    start = time.perf_counter()
+    for wallet_address in checksum_addresses:
+        contract = web3.eth.contract(address=contract_address, abi=abi)
+        contract.encodeABI(fn_name="balanceOf", args=[wallet_address])
+        decode_abi(["uint256"], result)
+    web3_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for wallet_address in wallet_addresses:
+        encode_balance_of(wallet_address)
+        decode_uint256(result)
+    raw_elapsed = time.perf_counter() - start
+
+    click.echo(
+        f"{calls} calls: web3 contract {web3_elapsed:.3f}s, raw {raw_elapsed:.3f}s "
+        f"({web3_elapsed / raw_elapsed:.0f}x)"
+    )
+
+
 if __name__ == "__main__":
     sys.path.append(os.path.join(sys.path[0], "src"))
     asyncio.run(main())
@@ -1,4 +1,4 @@
-from typing import Annotated
+from typing import Annotated, Any, Dict
 
 from auth.services import (
     AuthenticationService,
@@ -8,20 +8,29 @@ from auth.services import (
     ResetPasswordService,
     TokenService,
 )
-from fastapi import Header, HTTPException
+from fastapi import Depends, Header, HTTPException
+from fastapi.security import SecurityScopes
 from unit_of_work import UnitOfWork
 
+# Services hold no per-request state, so they are built once at startup
+_registration_service = RegistrationService(UnitOfWork)
+_authentication_service = AuthenticationService(UnitOfWork)
+_token_service = TokenService(UnitOfWork)
+_reset_password_service = ResetPasswordService(UnitOfWork)
+_deactivation_account_service = DeactivationAccountService(UnitOfWork)
+_reactivation_account_service = ReactivationAccountService(UnitOfWork)
+
 
 def registration_service() -> RegistrationService:
-    return RegistrationService(UnitOfWork)
+    return _registration_service
 
 
 def authentication_service() -> AuthenticationService:
-    return AuthenticationService(UnitOfWork)
+    return _authentication_service
 
 
 def token_service() -> TokenService:
-    return TokenService(UnitOfWork)
+    return _token_service
 
 
 def get_access_token(authorization: Annotated[str, Header()]) -> str:
@@ -41,13 +50,25 @@ def get_access_token(authorization: Annotated[str, Header()]) -> str:
     return access_token
 
 
+async def current_user(
+    security_scopes: SecurityScopes,
+    access_token: Annotated[str, Depends(get_access_token)],
+) -> Dict[str, Any]:
+    user_data = await _token_service.check_access_token(access_token)
+
+    if not set(security_scopes.scopes).issubset(user_data["scopes"]):
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+    return user_data
+
+
 def reset_password_service() -> ResetPasswordService:
-    return ResetPasswordService(UnitOfWork)
+    return _reset_password_service
 
 
 def deactivation_account_service() -> DeactivationAccountService:
-    return DeactivationAccountService(UnitOfWork)
+    return _deactivation_account_service
 
 
 def reactivation_account_service() -> ReactivationAccountService:
-    return ReactivationAccountService(UnitOfWork)
+    return _reactivation_account_service
@@ -0,0 +1,81 @@
+import re
+from email.headerregistry import BaseHeader
+from email.message import EmailMessage
+from email.policy import default
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Tuple
+
+from configs.config import settings
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from markupsafe import escape
+
+TEMPLATES_DIR = Path(__file__).parent / "templates" / "email"
+
+# Templates are compiled on first use and cached for the life of the worker
+environment = Environment(
+    loader=FileSystemLoader(TEMPLATES_DIR),
+    autoescape=select_autoescape(["html"]),
+    auto_reload=False,
+)
+
+PLACEHOLDER = re.compile("\x00(\\w+)\x00")
+
+
+@lru_cache(maxsize=None)
+def _render_skeleton(
+    template_name: str, layout: str, context_keys: Tuple[str, ...]
+) -> str:
+    """
+    Renders a template once with a placeholder in place of every context
+    value, so templates may print context values but not branch on them.
+    """
+    template = environment.get_template(f"{template_name}.jinja")
+
+    return template.render(
+        {key: f"\x00{key}\x00" for key in context_keys}, layout=layout
+    )
+
+
+def _fill_skeleton(skeleton: str, context: Dict[str, Any], html: bool) -> str:
+    return PLACEHOLDER.sub(
+        lambda match: str(escape(context[match[1]]) if html else context[match[1]]),
+        skeleton,
+    )
+
+
+@lru_cache(maxsize=None)
+def _static_headers(subject: str, sender: str) -> Tuple[BaseHeader, ...]:
+    # Parsing a header is the costly part of setting it, so the headers shared
+    # by every message of a kind are parsed once
+    return tuple(
+        default.header_factory(name, value)
+        for name, value in (
+            ("Subject", subject),
+            ("From", sender),
+            ("MIME-Version", "1.0"),
+        )
+    )
+
+
+def render_email(
+    template_name: str, subject: str, recipient: str, **context: Any
+) -> EmailMessage:
+    context_keys = tuple(sorted(context))
+    text = _render_skeleton(template_name, "base.txt", context_keys)
+    html = _render_skeleton(template_name, "base.html", context_keys)
+
+    subject_header, from_header, mime_version_header = _static_headers(
+        subject, settings.email.SMTP_USER
+    )
+
+    message = EmailMessage()
+    message["Subject"] = subject_header
+    message["From"] = from_header
+    message["To"] = recipient
+    message["MIME-Version"] = mime_version_header
+
+    message.set_content(_fill_skeleton(text, context, html=False))
+    message.add_alternative(_fill_skeleton(html, context, html=True), subtype="html")
+
+    return message
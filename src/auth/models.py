@@ -9,6 +9,9 @@ class User(Base):
     password: Mapped[str] = mapped_column(nullable=False)
     is_active: Mapped[bool] = mapped_column(nullable=False, default=True)
     is_verified: Mapped[bool] = mapped_column(nullable=False, default=False)
+    last_wallet_number: Mapped[int] = mapped_column(
+        nullable=False, default=0, server_default="0"
+    )
 
     wallets: Mapped[list["Wallet"]] = relationship(back_populates="user")
     wallet_groups: Mapped[list["WalletGroup"]] = relationship(back_populates="user")
@@ -17,9 +20,11 @@ class User(Base):
 class RefreshToken(Base):
     __tablename__ = "refresh_tokens"
 
-    sub: Mapped[int] = mapped_column(nullable=False)
+    sub: Mapped[int] = mapped_column(nullable=False, index=True)
     email: Mapped[str] = mapped_column(nullable=False)
     fingerprint: Mapped[str] = mapped_column(nullable=False)
-    refresh_token_uuid: Mapped[str] = mapped_column(nullable=False)
+    refresh_token_uuid: Mapped[str] = mapped_column(
+        nullable=False, unique=True, index=True
+    )
     iat: Mapped[int] = mapped_column(nullable=False)
-    exp: Mapped[int] = mapped_column(nullable=False)
+    exp: Mapped[int] = mapped_column(nullable=False, index=True)
@@ -1,5 +1,10 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, NamedTuple
+
 from auth.models import RefreshToken, User
+from redis.asyncio import Redis
 from repository import SQLAlchemyRepository
+from sqlalchemy import delete, func, insert, literal, select, true, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
@@ -7,7 +12,316 @@ class UserRepository(SQLAlchemyRepository[User]):
     def __init__(self, session: AsyncSession) -> None:
         super().__init__(session=session, model_cls=User)
 
+    async def lock_wallet_numbers(self, user_id: int) -> None:
+        """
+        Locks the user's wallet number counter until the transaction ends, so
+        concurrent imports of the same user run one after another.
+        """
+        statement = (
+            select(self._model_cls.id)
+            .where(self._model_cls.id == user_id)
+            .with_for_update()
+        )
+        await self._session.execute(statement)
+
+    async def reserve_wallet_numbers(self, user_id: int, count: int) -> int:
+        """
+        Atomically reserves a block of `count` wallet numbers for the user and
+        returns the first one.
+        """
+        statement = (
+            update(self._model_cls)
+            .where(self._model_cls.id == user_id)
+            .values(last_wallet_number=self._model_cls.last_wallet_number + count)
+            .returning(self._model_cls.last_wallet_number)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self._session.execute(statement)
+
+        return result.scalar_one() - count + 1
+
+    async def advance_wallet_number(self, user_id: int, number: int) -> None:
+        statement = (
+            update(self._model_cls)
+            .where(self._model_cls.id == user_id)
+            .values(
+                last_wallet_number=func.greatest(
+                    self._model_cls.last_wallet_number, number
+                )
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await self._session.execute(statement)
+
+
+class RotatedRefreshToken(NamedTuple):
+    sub: int
+    email: str
+    refresh_token_uuid: str | None
+
+
+class AbstractRefreshTokenRepository(ABC):
+    @abstractmethod
+    async def create(self, data: Dict[str, Any]) -> RefreshToken:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete_by_uuid(self, refresh_token_uuid: str) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def rotate(
+        self, refresh_token_uuid: str, fingerprint: str, now: int, data: Dict[str, Any]
+    ) -> RotatedRefreshToken | None:
+        """
+        Consume a refresh token and issue its replacement atomically.
+
+        Returns None if the token does not exist. If it exists but is expired
+        or the fingerprint does not match, it is still consumed and the returned
+        token has refresh_token_uuid set to None.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete_expired(self, now: int, limit: int) -> int:
+        raise NotImplementedError
 
-class RefreshTokenRepository(SQLAlchemyRepository[RefreshToken]):
+    @abstractmethod
+    async def limit_sessions(self, sub: int, max_sessions: int) -> int:
+        raise NotImplementedError
+
+
+class RefreshTokenRepository(
+    SQLAlchemyRepository[RefreshToken], AbstractRefreshTokenRepository
+):
     def __init__(self, session: AsyncSession):
         super().__init__(session=session, model_cls=RefreshToken)
+
+    async def delete_by_uuid(self, refresh_token_uuid: str) -> bool:
+        statement = (
+            delete(self._model_cls)
+            .where(self._model_cls.refresh_token_uuid == refresh_token_uuid)
+            .execution_options(synchronize_session=False)
+        )
+
+        result = await self._session.execute(statement)
+
+        return result.rowcount > 0
+
+    async def rotate(
+        self, refresh_token_uuid: str, fingerprint: str, now: int, data: Dict[str, Any]
+    ) -> RotatedRefreshToken | None:
+        consumed = (
+            delete(self._model_cls)
+            .where(self._model_cls.refresh_token_uuid == refresh_token_uuid)
+            .returning(
+                self._model_cls.sub,
+                self._model_cls.email,
+                self._model_cls.fingerprint,
+                self._model_cls.exp,
+            )
+            .cte("consumed")
+        )
+        issued = (
+            insert(self._model_cls)
+            .from_select(
+                ["sub", "email", "fingerprint", "refresh_token_uuid", "iat", "exp"],
+                select(
+                    consumed.c.sub,
+                    consumed.c.email,
+                    consumed.c.fingerprint,
+                    literal(data["refresh_token_uuid"]),
+                    literal(data["iat"]),
+                    literal(data["exp"]),
+                ).where(consumed.c.exp >= now, consumed.c.fingerprint == fingerprint),
+            )
+            .returning(self._model_cls.refresh_token_uuid)
+            .cte("issued")
+        )
+        statement = select(
+            consumed.c.sub, consumed.c.email, issued.c.refresh_token_uuid
+        ).select_from(consumed.outerjoin(issued, true()))
+
+        result = await self._session.execute(statement)
+        row = result.one_or_none()
+
+        if row is None:
+            return None
+
+        return RotatedRefreshToken(*row)
+
+    async def delete_expired(self, now: int, limit: int) -> int:
+        expired_ids = (
+            select(self._model_cls.id)
+            .where(self._model_cls.exp < now)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        statement = (
+            delete(self._model_cls)
+            .where(self._model_cls.id.in_(expired_ids))
+            .execution_options(synchronize_session=False)
+        )
+
+        result = await self._session.execute(statement)
+
+        return result.rowcount
+
+    async def limit_sessions(self, sub: int, max_sessions: int) -> int:
+        stale_ids = (
+            select(self._model_cls.id)
+            .where(self._model_cls.sub == sub)
+            .order_by(self._model_cls.iat.desc(), self._model_cls.id.desc())
+            .offset(max_sessions)
+            .scalar_subquery()
+        )
+        statement = (
+            delete(self._model_cls)
+            .where(self._model_cls.id.in_(stale_ids))
+            .execution_options(synchronize_session=False)
+        )
+
+        result = await self._session.execute(statement)
+
+        return result.rowcount
+
+
+REFRESH_TOKEN_KEY_PREFIX = "refresh_token:"
+REFRESH_TOKEN_SESSIONS_KEY_PREFIX = "refresh_token_sessions:"
+
+# KEYS[1] - token key
+# ARGV[1] - sessions key prefix, ARGV[2] - token uuid
+DELETE_SCRIPT = """
+local sub = redis.call('HGET', KEYS[1], 'sub')
+if not sub then
+    return 0
+end
+redis.call('DEL', KEYS[1])
+redis.call('ZREM', ARGV[1] .. sub, ARGV[2])
+return 1
+"""
+
+# KEYS[1] - presented token key, KEYS[2] - new token key
+# ARGV[1] - sessions key prefix, ARGV[2] - now, ARGV[3] - fingerprint,
+# ARGV[4] - new token uuid, ARGV[5] - new token iat, ARGV[6] - new token exp
+ROTATE_SCRIPT = """
+local fields = redis.call('HGETALL', KEYS[1])
+if #fields == 0 then
+    return nil
+end
+local token = {}
+for i = 1, #fields, 2 do
+    token[fields[i]] = fields[i + 1]
+end
+local sessions_key = ARGV[1] .. token['sub']
+redis.call('DEL', KEYS[1])
+redis.call('ZREM', sessions_key, token['refresh_token_uuid'])
+if tonumber(token['exp']) < tonumber(ARGV[2]) or token['fingerprint'] ~= ARGV[3] then
+    return {token['sub'], token['email'], false}
+end
+redis.call(
+    'HSET', KEYS[2],
+    'sub', token['sub'],
+    'email', token['email'],
+    'fingerprint', token['fingerprint'],
+    'refresh_token_uuid', ARGV[4],
+    'iat', ARGV[5],
+    'exp', ARGV[6]
+)
+redis.call('EXPIREAT', KEYS[2], ARGV[6])
+redis.call('ZADD', sessions_key, ARGV[6], ARGV[4])
+redis.call('EXPIREAT', sessions_key, ARGV[6])
+return {token['sub'], token['email'], ARGV[4]}
+"""
+
+# KEYS[1] - sessions key
+# ARGV[1] - max sessions, ARGV[2] - token key prefix
+LIMIT_SESSIONS_SCRIPT = """
+local last_stale = -(tonumber(ARGV[1]) + 1)
+local stale = redis.call('ZRANGE', KEYS[1], 0, last_stale)
+for _, token_uuid in ipairs(stale) do
+    redis.call('DEL', ARGV[2] .. token_uuid)
+end
+redis.call('ZREMRANGEBYRANK', KEYS[1], 0, last_stale)
+return #stale
+"""
+
+
+class RedisRefreshTokenRepository(AbstractRefreshTokenRepository):
+    """
+    Refresh tokens are stored as hashes expiring together with the token.
+    Every user also has a sorted set of their token uuids scored by expiry,
+    used to cap concurrent sessions.
+    """
+
+    def __init__(self, client: Redis) -> None:
+        self._client = client
+        self._delete_script = client.register_script(DELETE_SCRIPT)
+        self._rotate_script = client.register_script(ROTATE_SCRIPT)
+        self._limit_sessions_script = client.register_script(LIMIT_SESSIONS_SCRIPT)
+
+    async def create(self, data: Dict[str, Any]) -> RefreshToken:
+        token_key = REFRESH_TOKEN_KEY_PREFIX + data["refresh_token_uuid"]
+        sessions_key = REFRESH_TOKEN_SESSIONS_KEY_PREFIX + str(data["sub"])
+
+        async with self._client.pipeline(transaction=True) as pipe:
+            pipe.hset(token_key, mapping=data)
+            pipe.expireat(token_key, data["exp"])
+            pipe.zadd(sessions_key, {data["refresh_token_uuid"]: data["exp"]})
+            pipe.expireat(sessions_key, data["exp"])
+            await pipe.execute()
+
+        return RefreshToken(**data)
+
+    async def delete_by_uuid(self, refresh_token_uuid: str) -> bool:
+        deleted = await self._delete_script(
+            keys=[REFRESH_TOKEN_KEY_PREFIX + refresh_token_uuid],
+            args=[REFRESH_TOKEN_SESSIONS_KEY_PREFIX, refresh_token_uuid],
+        )
+
+        return bool(deleted)
+
+    async def rotate(
+        self, refresh_token_uuid: str, fingerprint: str, now: int, data: Dict[str, Any]
+    ) -> RotatedRefreshToken | None:
+        result = await self._rotate_script(
+            keys=[
+                REFRESH_TOKEN_KEY_PREFIX + refresh_token_uuid,
+                REFRESH_TOKEN_KEY_PREFIX + data["refresh_token_uuid"],
+            ],
+            args=[
+                REFRESH_TOKEN_SESSIONS_KEY_PREFIX,
+                now,
+                fingerprint,
+                data["refresh_token_uuid"],
+                data["iat"],
+                data["exp"],
+            ],
+        )
+
+        if result is None:
+            return None
+
+        sub, email, new_refresh_token_uuid = result
+
+        return RotatedRefreshToken(int(sub), email, new_refresh_token_uuid)
+
+    async def delete_expired(self, now: int, limit: int) -> int:
+        # Token hashes expire by themselves, only session sets need pruning
+        deleted = 0
+
+        async for sessions_key in self._client.scan_iter(
+            match=REFRESH_TOKEN_SESSIONS_KEY_PREFIX + "*", count=limit
+        ):
+            deleted += await self._client.zremrangebyscore(
+                sessions_key, "-inf", f"({now}"
+            )
+
+        return deleted
+
+    async def limit_sessions(self, sub: int, max_sessions: int) -> int:
+        return await self._limit_sessions_script(
+            keys=[REFRESH_TOKEN_SESSIONS_KEY_PREFIX + str(sub)],
+            args=[max_sessions, REFRESH_TOKEN_KEY_PREFIX],
+        )
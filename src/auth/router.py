@@ -1,7 +1,8 @@
-from typing import Annotated
+from typing import Annotated, Any, Dict
 
 from auth.dependencies import (
     authentication_service,
+    current_user,
     deactivation_account_service,
     get_access_token,
     reactivation_account_service,
@@ -112,11 +113,10 @@ async def refresh(
 @router.get("/logout/", status_code=204)
 async def logout(
     response: Response,
-    access_token: Annotated[str, Depends(get_access_token)],
+    user_data: Annotated[Dict[str, Any], Depends(current_user)],
     refresh_token_uuid: Annotated[str, Cookie()],
     token_service: Annotated[TokenService, Depends(token_service)],
 ):
-    await token_service.check_access_token(access_token)
     await token_service.delete_refresh_token(refresh_token_uuid=refresh_token_uuid)
 
     response.delete_cookie("refresh_token_uuid")
@@ -156,24 +156,22 @@ async def check_reset_password_token(
 @router.get("/deactivate/", status_code=204)
 async def send_deactivation_account_email(
     access_token: Annotated[str, Depends(get_access_token)],
-    token_service: Annotated[TokenService, Depends(token_service)],
+    user_data: Annotated[Dict[str, Any], Depends(current_user)],
     deactivation_account_service: Annotated[
         DeactivationAccountService, Depends(deactivation_account_service)
     ],
 ) -> None:
-    await token_service.check_access_token(access_token)
     await deactivation_account_service.send_deactivation_account_email(access_token)
 
 
 @router.post("/deactivate/", status_code=204)
 async def deactivate_account(
     access_token: Annotated[str, Depends(get_access_token)],
-    token_service: Annotated[TokenService, Depends(token_service)],
+    user_data: Annotated[Dict[str, Any], Depends(current_user)],
     deactivation_account_service: Annotated[
         DeactivationAccountService, Depends(deactivation_account_service)
     ],
 ) -> None:
-    await token_service.check_access_token(access_token)
     await deactivation_account_service.deactivate_account(access_token)
 
 
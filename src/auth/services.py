@@ -2,6 +2,7 @@ import uuid
 from datetime import datetime, timedelta
 from typing import Any, Type
 
+from auth.repository import RotatedRefreshToken
 from auth.schemas import (
     AccessTokenSchema,
     LoginUserSchema,
@@ -25,19 +26,19 @@ from unit_of_work import UnitOfWork
 
 class RegistrationService:
     def __init__(self, unit_of_work: Type[UnitOfWork]) -> None:
-        self._unit_of_work = unit_of_work(async_session)
+        self._unit_of_work = unit_of_work
 
     async def register_user(self, user_data: RegisterUserSchema) -> UserSchema:
-        async with self._unit_of_work as uow:
-            if await uow.user.get_by(email=user_data.email):
-                raise HTTPException(status_code=409, detail="User already exists")
-
+        async with self._unit_of_work(async_session) as uow:
             hashed_password = hash_password(user_data.password)
             user_data.password = hashed_password
 
-            user = await uow.user.create(user_data.model_dump())
+            user = await uow.user.create_if_not_exists(user_data.model_dump())
+
+            if not user:
+                raise HTTPException(status_code=409, detail="User already exists")
 
-            send_email_confirmation_link.delay(user.email)
+            await uow.outbox.enqueue(send_email_confirmation_link.name, [user.email])
 
             await uow.commit()
 
@@ -49,7 +50,7 @@ class RegistrationService:
         )
 
     async def confirm_email(self, token: str) -> UserSchema:
-        async with self._unit_of_work as uow:
+        async with self._unit_of_work(async_session) as uow:
             try:
                 payload = serializer.loads(
                     token, salt=settings.crypto.SALT_EMAIL_CONFIRMATION, max_age=3600
@@ -84,11 +85,11 @@ class RegistrationService:
 
 class AuthenticationService:
     def __init__(self, unit_of_work: Type[UnitOfWork]) -> None:
-        self._unit_of_work = unit_of_work(async_session)
+        self._unit_of_work = unit_of_work
         self._token_service = TokenService(unit_of_work)
 
     async def authenticate_user(self, user: LoginUserSchema) -> TokensSchema:
-        async with self._unit_of_work as uow:
+        async with self._unit_of_work(async_session) as uow:
             user_from_db = await uow.user.get_by(email=user.email)
 
             if not user_from_db or not validate_password_hash(
@@ -113,13 +114,13 @@ class AuthenticationService:
 
 class TokenService:
     def __init__(self, unit_of_work: Type[UnitOfWork]) -> None:
-        self._unit_of_work = unit_of_work(async_session)
+        self._unit_of_work = unit_of_work
         self._token_generator = TokenGenerator()
 
     async def create_tokens(
         self, user_id: int, user_email: str, fingerprint: str
     ) -> TokensSchema:
-        async with self._unit_of_work as uow:
+        async with self._unit_of_work(async_session) as uow:
             access_token = await self._token_generator.generate_access_token(
                 user_id, user_email
             )
@@ -134,34 +135,28 @@ class TokenService:
     async def renew_tokens(
         self, refresh_token_uuid: str, fingerprint: str
     ) -> TokensSchema:
-        async with self._unit_of_work as uow:
-            refresh_token = await uow.refresh_token.get_by(
-                refresh_token_uuid=refresh_token_uuid
+        async with self._unit_of_work(async_session) as uow:
+            rotated_token = await self._token_generator.rotate_refresh_token(
+                uow, refresh_token_uuid, fingerprint
             )
 
-            if not refresh_token:
+            if not rotated_token:
                 raise HTTPException(status_code=401, detail="Refresh token not found")
 
-            await uow.refresh_token.delete(refresh_token)
+            # The presented token is consumed even when it is rejected
+            await uow.commit()
 
-            if (
-                refresh_token.exp < int(datetime.now().timestamp())
-                or not refresh_token.fingerprint == fingerprint
-            ):
+            if not rotated_token.refresh_token_uuid:
                 raise HTTPException(status_code=403, detail="Invalid refresh token")
 
-            access_token = await self._token_generator.generate_access_token(
-                refresh_token.sub, refresh_token.email
-            )
-            refresh_token_uuid = await self._token_generator.generate_refresh_token(
-                uow, refresh_token.sub, refresh_token.email, fingerprint
-            )
-
-            await uow.commit()
+        access_token = await self._token_generator.generate_access_token(
+            rotated_token.sub, rotated_token.email
+        )
 
-            return TokensSchema(
-                access_token=access_token, refresh_token_uuid=refresh_token_uuid
-            )
+        return TokensSchema(
+            access_token=access_token,
+            refresh_token_uuid=rotated_token.refresh_token_uuid,
+        )
 
     async def check_access_token(self, access_token: str) -> dict[str, Any]:
         payload = decode_jwt(access_token)
@@ -181,16 +176,10 @@ class TokenService:
         return user_data
 
     async def delete_refresh_token(self, refresh_token_uuid: str) -> None:
-        async with self._unit_of_work as uow:
-            refresh_token = await uow.refresh_token.get_by(
-                refresh_token_uuid=refresh_token_uuid
-            )
-
-            if not refresh_token:
+        async with self._unit_of_work(async_session) as uow:
+            if not await uow.refresh_token.delete_by_uuid(refresh_token_uuid):
                 raise HTTPException(status_code=401, detail="Refresh token not found")
 
-            await uow.refresh_token.delete(refresh_token)
-
             await uow.commit()
 
 
@@ -206,7 +195,7 @@ class TokenGenerator:
         payload = {
             "sub": user_id,
             "email": user_email,
-            "scopes": [],
+            "scopes": settings.token.DEFAULT_SCOPES,
             "iat": int(iat.timestamp()),
             "exp": int(exp.timestamp()),
         }
@@ -235,27 +224,45 @@ class TokenGenerator:
 
         await uow.refresh_token.create(payload)
 
+        if settings.token.MAX_SESSIONS_PER_USER is not None:
+            await uow.refresh_token.limit_sessions(
+                user_id, settings.token.MAX_SESSIONS_PER_USER
+            )
+
         return refresh_token_uuid
 
+    async def rotate_refresh_token(
+        self, uow: UnitOfWork, refresh_token_uuid: str, fingerprint: str
+    ) -> RotatedRefreshToken | None:
+        iat = datetime.now()
+        exp = datetime.now() + timedelta(days=settings.token.REFRESH_TOKNE_EXPIRE_DAYS)
+
+        payload = {
+            "refresh_token_uuid": str(uuid.uuid4()),
+            "iat": int(iat.timestamp()),
+            "exp": int(exp.timestamp()),
+        }
+
+        return await uow.refresh_token.rotate(
+            refresh_token_uuid, fingerprint, int(iat.timestamp()), payload
+        )
+
     async def delete_refresh_token(
         self, uow: UnitOfWork, refresh_token_uuid: str
     ) -> None:
-        refresh_token = await uow.refresh_token.get_by(
-            refresh_token_uuid=refresh_token_uuid
-        )
-
-        if not refresh_token:
+        if not await uow.refresh_token.delete_by_uuid(refresh_token_uuid):
             raise HTTPException(status_code=401, detail="Refresh token not found")
 
-        await uow.refresh_token.delete(refresh_token)
-
 
 class ResetPasswordService:
     def __init__(self, unit_of_work: Type[UnitOfWork]) -> None:
-        self._unit_of_work = unit_of_work(async_session)
+        self._unit_of_work = unit_of_work
 
     async def send_reset_password_email(self, email: str) -> None:
-        send_reset_password_link.delay(email)
+        async with self._unit_of_work(async_session) as uow:
+            await uow.outbox.enqueue(send_reset_password_link.name, [email])
+
+            await uow.commit()
 
     async def check_reset_password_token(self, token: str) -> None:
         try:
@@ -272,7 +279,7 @@ class ResetPasswordService:
             )
 
     async def reset_password(self, token: str, new_password: str) -> None:
-        async with self._unit_of_work as uow:
+        async with self._unit_of_work(async_session) as uow:
             try:
                 payload = serializer.loads(
                     token, salt=settings.crypto.SALT_RESET_PASSWORD, max_age=3600
@@ -308,10 +315,13 @@ class ResetPasswordService:
 
 class DeactivationAccountService:
     def __init__(self, unit_of_work: Type[UnitOfWork]) -> None:
-        self._unit_of_work = unit_of_work(async_session)
+        self._unit_of_work = unit_of_work
 
     async def send_deactivation_account_email(self, email: str) -> None:
-        send_deactivation_account_link.delay(email)
+        async with self._unit_of_work(async_session) as uow:
+            await uow.outbox.enqueue(send_deactivation_account_link.name, [email])
+
+            await uow.commit()
 
     async def check_deactivation_account_token(self, token: str) -> None:
         try:
@@ -324,7 +334,7 @@ class DeactivationAccountService:
             raise HTTPException(status_code=404, detail="Deactivation link is invalid")
 
     async def deactivate_account(self, token: str) -> None:
-        async with self._unit_of_work as uow:
+        async with self._unit_of_work(async_session) as uow:
             try:
                 payload = serializer.loads(
                     token, salt=settings.crypto.SALT_DEACTIVATION_ACCOUNT, max_age=3600
@@ -352,10 +362,13 @@ class DeactivationAccountService:
 
 class ReactivationAccountService:
     def __init__(self, unit_of_work: Type[UnitOfWork]) -> None:
-        self._unit_of_work = unit_of_work(async_session)
+        self._unit_of_work = unit_of_work
 
     async def send_reactivation_account_email(self, email: str) -> None:
-        send_reactivation_account_link.delay(email)
+        async with self._unit_of_work(async_session) as uow:
+            await uow.outbox.enqueue(send_reactivation_account_link.name, [email])
+
+            await uow.commit()
 
     async def check_reactivation_account_token(self, token: str) -> None:
         try:
@@ -370,7 +383,7 @@ class ReactivationAccountService:
             raise HTTPException(status_code=404, detail="Reactivation link is invalid")
 
     async def reactivation_account(self, token: str, new_password: str) -> None:
-        async with self._unit_of_work as uow:
+        async with self._unit_of_work(async_session) as uow:
             try:
                 payload = serializer.loads(
                     token,
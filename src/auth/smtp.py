@@ -0,0 +1,330 @@
+import asyncio
+import queue
+import smtplib
+import threading
+import time
+from email.message import EmailMessage
+
+import aiosmtplib
+from celery.signals import worker_process_init, worker_process_shutdown
+from configs.config import settings
+
+
+class PooledSMTPConnection:
+    __slots__ = ("smtp", "sent_messages", "last_used")
+
+    def __init__(self, smtp: smtplib.SMTP | aiosmtplib.SMTP) -> None:
+        self.smtp = smtp
+        self.sent_messages = 0
+        self.last_used = time.monotonic()
+
+
+class SMTPConnectionPool:
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        user: str,
+        password: str,
+        use_ssl: bool = True,
+        size: int = 1,
+        max_messages_per_connection: int = 100,
+        idle_timeout: float = 60,
+        timeout: float = 30,
+    ) -> None:
+        self._host = host
+        self._port = port
+        self._user = user
+        self._password = password
+        self._use_ssl = use_ssl
+        self._max_messages_per_connection = max_messages_per_connection
+        self._idle_timeout = idle_timeout
+        self._timeout = timeout
+        self._idle: queue.LifoQueue[PooledSMTPConnection] = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def send_message(self, message: EmailMessage) -> None:
+        with self._slots:
+            connection = self._acquire()
+
+            try:
+                try:
+                    connection.smtp.send_message(message)
+                except smtplib.SMTPServerDisconnected:
+                    # The server may drop a connection right after a successful NOOP
+                    self._discard(connection)
+                    connection = self._connect()
+                    connection.smtp.send_message(message)
+            except BaseException:
+                self._discard(connection)
+                raise
+
+            connection.sent_messages += 1
+            self._release(connection)
+
+    def close_all(self) -> None:
+        while True:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                return
+
+            self._discard(connection)
+
+    def _acquire(self) -> PooledSMTPConnection:
+        while True:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect()
+
+            if self._is_alive(connection):
+                return connection
+
+            self._discard(connection)
+
+    def _release(self, connection: PooledSMTPConnection) -> None:
+        if connection.sent_messages >= self._max_messages_per_connection:
+            self._discard(connection)
+            return
+
+        connection.last_used = time.monotonic()
+        self._idle.put(connection)
+
+    def _connect(self) -> PooledSMTPConnection:
+        if self._use_ssl:
+            smtp = smtplib.SMTP_SSL(self._host, self._port, timeout=self._timeout)
+        else:
+            smtp = smtplib.SMTP(self._host, self._port, timeout=self._timeout)
+
+        try:
+            smtp.ehlo()
+
+            if smtp.has_extn("auth"):
+                smtp.login(self._user, self._password)
+        except BaseException:
+            smtp.close()
+            raise
+
+        return PooledSMTPConnection(smtp)
+
+    def _is_alive(self, connection: PooledSMTPConnection) -> bool:
+        # Servers close idle sessions on their own, so stale ones are not probed
+        if time.monotonic() - connection.last_used > self._idle_timeout:
+            return False
+
+        try:
+            return connection.smtp.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    def _discard(self, connection: PooledSMTPConnection) -> None:
+        try:
+            connection.smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            connection.smtp.close()
+
+
+class AsyncRateLimiter:
+    def __init__(self, rate_per_second: float) -> None:
+        self._interval = 1 / rate_per_second
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            now = asyncio.get_running_loop().time()
+            delay = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self._interval
+
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class AsyncSMTPSender:
+    """
+    Delivers messages from an event loop running in a background thread,
+    so many worker threads can share a handful of SMTP connections and
+    have hundreds of sends in flight per process.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        user: str,
+        password: str,
+        use_ssl: bool = True,
+        max_in_flight: int = 100,
+        rate_limit_per_second: float | None = None,
+        max_messages_per_connection: int = 100,
+        idle_timeout: float = 60,
+        timeout: float = 30,
+    ) -> None:
+        self._host = host
+        self._port = port
+        self._user = user
+        self._password = password
+        self._use_ssl = use_ssl
+        self._max_messages_per_connection = max_messages_per_connection
+        self._idle_timeout = idle_timeout
+        self._timeout = timeout
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self._rate_limiter = (
+            AsyncRateLimiter(rate_limit_per_second) if rate_limit_per_second else None
+        )
+        self._idle: asyncio.LifoQueue[PooledSMTPConnection] = asyncio.LifoQueue()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="smtp-sender", daemon=True
+        )
+        self._thread.start()
+
+    def send_message(self, message: EmailMessage) -> None:
+        future = asyncio.run_coroutine_threadsafe(
+            self.send_message_async(message), self._loop
+        )
+        future.result()
+
+    async def send_message_async(self, message: EmailMessage) -> None:
+        async with self._in_flight:
+            if self._rate_limiter is not None:
+                await self._rate_limiter.acquire()
+
+            connection = await self._acquire()
+
+            try:
+                try:
+                    await connection.smtp.send_message(message)
+                except aiosmtplib.SMTPServerDisconnected:
+                    await self._discard(connection)
+                    connection = await self._connect()
+                    await connection.smtp.send_message(message)
+            except BaseException:
+                await self._discard(connection)
+                raise
+
+            connection.sent_messages += 1
+            await self._release(connection)
+
+    def close_all(self) -> None:
+        asyncio.run_coroutine_threadsafe(self._close_idle(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    async def _close_idle(self) -> None:
+        while not self._idle.empty():
+            await self._discard(self._idle.get_nowait())
+
+    async def _acquire(self) -> PooledSMTPConnection:
+        while not self._idle.empty():
+            connection = self._idle.get_nowait()
+
+            if await self._is_alive(connection):
+                return connection
+
+            await self._discard(connection)
+
+        return await self._connect()
+
+    async def _release(self, connection: PooledSMTPConnection) -> None:
+        if connection.sent_messages >= self._max_messages_per_connection:
+            await self._discard(connection)
+            return
+
+        connection.last_used = time.monotonic()
+        self._idle.put_nowait(connection)
+
+    async def _connect(self) -> PooledSMTPConnection:
+        smtp = aiosmtplib.SMTP(
+            hostname=self._host,
+            port=self._port,
+            use_tls=self._use_ssl,
+            timeout=self._timeout,
+        )
+        await smtp.connect()
+
+        try:
+            await smtp.ehlo()
+
+            if smtp.supports_extension("auth"):
+                await smtp.login(self._user, self._password)
+        except BaseException:
+            smtp.close()
+            raise
+
+        return PooledSMTPConnection(smtp)
+
+    async def _is_alive(self, connection: PooledSMTPConnection) -> bool:
+        if time.monotonic() - connection.last_used > self._idle_timeout:
+            return False
+
+        try:
+            return (await connection.smtp.noop()).code == 250
+        except (aiosmtplib.SMTPException, OSError):
+            return False
+
+    async def _discard(self, connection: PooledSMTPConnection) -> None:
+        try:
+            await connection.smtp.quit()
+        except (aiosmtplib.SMTPException, OSError):
+            connection.smtp.close()
+
+
+_email_sender: SMTPConnectionPool | AsyncSMTPSender | None = None
+_email_sender_lock = threading.Lock()
+
+
+def create_email_sender(
+    delivery_mode: str = settings.email.DELIVERY_MODE,
+) -> SMTPConnectionPool | AsyncSMTPSender:
+    if delivery_mode == "async":
+        return AsyncSMTPSender(
+            host=settings.email.SMTP_HOST,
+            port=settings.email.SMTP_PORT,
+            user=settings.email.SMTP_USER,
+            password=settings.email.SMTP_PASSWORD,
+            use_ssl=settings.email.SMTP_USE_SSL,
+            max_in_flight=settings.email.ASYNC_MAX_IN_FLIGHT,
+            rate_limit_per_second=settings.email.RATE_LIMIT_PER_SECOND,
+            max_messages_per_connection=settings.email.SMTP_MAX_MESSAGES_PER_CONNECTION,
+            idle_timeout=settings.email.SMTP_IDLE_TIMEOUT_SECONDS,
+            timeout=settings.email.SMTP_TIMEOUT_SECONDS,
+        )
+
+    return SMTPConnectionPool(
+        host=settings.email.SMTP_HOST,
+        port=settings.email.SMTP_PORT,
+        user=settings.email.SMTP_USER,
+        password=settings.email.SMTP_PASSWORD,
+        use_ssl=settings.email.SMTP_USE_SSL,
+        size=settings.email.SMTP_POOL_SIZE,
+        max_messages_per_connection=settings.email.SMTP_MAX_MESSAGES_PER_CONNECTION,
+        idle_timeout=settings.email.SMTP_IDLE_TIMEOUT_SECONDS,
+        timeout=settings.email.SMTP_TIMEOUT_SECONDS,
+    )
+
+
+def get_email_sender() -> SMTPConnectionPool | AsyncSMTPSender:
+    global _email_sender
+
+    if _email_sender is None:
+        with _email_sender_lock:
+            if _email_sender is None:
+                _email_sender = create_email_sender()
+
+    return _email_sender
+
+
+@worker_process_init.connect
+def reset_email_sender(**kwargs) -> None:
+    # Every forked worker process must open its own connections
+    global _email_sender
+
+    _email_sender = None
+
+
+@worker_process_shutdown.connect
+def close_email_sender(**kwargs) -> None:
+    if _email_sender is not None:
+        _email_sender.close_all()
@@ -1,8 +1,16 @@
-import smtplib
-from email.message import EmailMessage
+import asyncio
+from datetime import datetime
 
+from auth.emails import render_email
+from auth.smtp import get_email_sender
+from celery.utils.log import get_task_logger
 from configs.celery import celery
 from configs.config import serializer, settings
+from database import task_session
+from redis_client import get_redis_client
+from unit_of_work import UnitOfWork
+
+logger = get_task_logger(__name__)
 
 
 @celery.task
@@ -14,33 +22,11 @@ def send_email_confirmation_link(email: str) -> None:
         f"{settings.FRONTEND_DOMAIN}/api/auth/email-confirmation/{token}"
     )
 
-    message = EmailMessage()
-    message["Subject"] = "Confirm your email"
-    message["From"] = settings.email.SMTP_USER
-    message["To"] = email
-
-    message_html = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Email Confirmation</title>
-</head>
-<body style="font-family: Arial, sans-serif; background-color: #002147; color: #ffffff; margin: 0; padding: 0; text-align: center;">
-    <div style="width: 80%; max-width: 600px; margin: 100px auto;">
-        <h1 style="color: #7abaff;">Email Confirmation</h1>
-        <p>Thank you for signing up! Please click the button below to confirm your email address.</p>
-        <a href="{confirmation_link}" style="display: inline-block; background-color: #7abaff; color: #002147; text-decoration: none; padding: 10px 20px; border-radius: 5px; margin-top: 20px;">Confirm Email</a>
-    </div>
-</body>
-</html>
-"""
-
-    message.set_content(message_html, subtype="html")
-
-    with smtplib.SMTP_SSL(settings.email.SMTP_HOST, settings.email.SMTP_PORT) as server:
-        server.login(settings.email.SMTP_USER, settings.email.SMTP_PASSWORD)
-        server.sendmail(settings.email.SMTP_USER, email, message.as_string())
+    message = render_email(
+        "email_confirmation", "Confirm your email", email, link=confirmation_link
+    )
+
+    get_email_sender().send_message(message)
 
 
 @celery.task
@@ -48,36 +34,15 @@ def send_reset_password_link(email: str) -> None:
     token = serializer.dumps({"email": email}, salt=settings.crypto.SALT_RESET_PASSWORD)
     reset_password_link = f"{settings.FRONTEND_DOMAIN}/api/auth/reset-password/{token}"
 
-    message = EmailMessage()
-    message["Subject"] = "Reset your password"
-    message["From"] = settings.email.SMTP_USER
-    message["To"] = email
-
-    message_html = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Password Reset</title>
-</head>
-<body style="font-family: Arial, sans-serif; background-color: #002147; color: #ffffff; margin: 0; padding: 0; text-align: center;">
-    <div style="width: 80%; max-width: 600px; margin: 100px auto;">
-        <h1 style="color: #7abaff;">Password Reset</h1>
-        <p>You've requested to reset your password. Please click the button below to reset it.</p>
-        <a href="{reset_password_link}" style="display: inline-block; background-color: #7abaff; color: #002147; text-decoration: none; padding: 10px 20px; border-radius: 5px; margin-top: 20px;">Reset Password</a>
-    </div>
-</body>
-</html>"""
-
-    message.set_content(message_html, subtype="html")
-
-    with smtplib.SMTP_SSL(settings.email.SMTP_HOST, settings.email.SMTP_PORT) as server:
-        server.login(settings.email.SMTP_USER, settings.email.SMTP_PASSWORD)
-        server.sendmail(settings.email.SMTP_USER, email, message.as_string())
+    message = render_email(
+        "reset_password", "Reset your password", email, link=reset_password_link
+    )
+
+    get_email_sender().send_message(message)
 
 
 @celery.task
-def send_deactivation_account_link(email: str, deactivation_account_link: str) -> None:
+def send_deactivation_account_link(email: str) -> None:
     token = serializer.dumps(
         {"email": email}, salt=settings.crypto.SALT_DEACTIVATION_ACCOUNT
     )
@@ -85,36 +50,18 @@ def send_deactivation_account_link(email: str, deactivation_account_link: str) -
         f"{settings.FRONTEND_DOMAIN}/api/auth/reset-password/{token}"
     )
 
-    message = EmailMessage()
-    message["Subject"] = "Deactivation Account"
-    message["From"] = settings.email.SMTP_USER
-    message["To"] = email
-
-    message_html = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Deactivation Account</title>
-</head>
-<body style="font-family: Arial, sans-serif; background-color: #002147; color: #ffffff; margin: 0; padding: 0; text-align: center;">
-    <div style="width: 80%; max-width: 600px; margin: 100px auto;">
-        <h1 style="color: #7abaff;">Deactivation Account</h1>
-        <p>You've requested to deactivate your account. Please click the button below to deactivate it.</p>
-        <a href="{deactivation_account_link}" style="display: inline-block; background-color: #7abaff; color: #002147; text-decoration: none; padding: 10px 20px; border-radius: 5px; margin-top: 20px;">Deactivate Account</a>
-    </div>
-</body>
-</html>"""
-
-    message.set_content(message_html, subtype="html")
-
-    with smtplib.SMTP_SSL(settings.email.SMTP_HOST, settings.email.SMTP_PORT) as server:
-        server.login(settings.email.SMTP_USER, settings.email.SMTP_PASSWORD)
-        server.sendmail(settings.email.SMTP_USER, email, message.as_string())
+    message = render_email(
+        "deactivation_account",
+        "Deactivation Account",
+        email,
+        link=deactivation_account_link,
+    )
+
+    get_email_sender().send_message(message)
 
 
 @celery.task
-def send_reactivation_account_link(email: str, activation_account_link: str) -> None:
+def send_reactivation_account_link(email: str) -> None:
     token = serializer.dumps(
         {"email": email}, salt=settings.crypto.SALT_REACTIVATION_ACCOUNT
     )
@@ -122,29 +69,46 @@ def send_reactivation_account_link(email: str, activation_account_link: str) ->
         f"{settings.FRONTEND_DOMAIN}/api/auth/reset-password/{token}"
     )
 
-    message = EmailMessage()
-    message["Subject"] = "Reactivation Account"
-    message["From"] = settings.email.SMTP_USER
-    message["To"] = email
-
-    message_html = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Reactivation Account</title>
-</head>
-<body style="font-family: Arial, sans-serif; background-color: #002147; color: #ffffff; margin: 0; padding: 0; text-align: center;">
-    <div style="width: 80%; max-width: 600px; margin: 100px auto;">
-        <h1 style="color: #7abaff;">Reactivation Account</h1>
-        <p>You've requested to reactivate your account. Please click the button below to reactivate it.</p>
-        <a href="{reactivation_account_link}" style="display: inline-block; background-color: #7abaff; color: #002147; text-decoration: none; padding: 10px 20px; border-radius: 5px; margin-top: 20px;">Reactivate Account</a>
-    </div>
-</body>
-</html>"""
-
-    message.set_content(message_html, subtype="html")
-
-    with smtplib.SMTP_SSL(settings.email.SMTP_HOST, settings.email.SMTP_PORT) as server:
-        server.login(settings.email.SMTP_USER, settings.email.SMTP_PASSWORD)
-        server.sendmail(settings.email.SMTP_USER, email, message.as_string())
+    message = render_email(
+        "reactivation_account",
+        "Reactivation Account",
+        email,
+        link=reactivation_account_link,
+    )
+
+    get_email_sender().send_message(message)
+
+
+@celery.task
+def delete_expired_refresh_tokens() -> int:
+    deleted = asyncio.run(_delete_expired_refresh_tokens())
+
+    logger.info("Deleted %d expired refresh tokens", deleted)
+
+    return deleted
+
+
+async def _delete_expired_refresh_tokens() -> int:
+    now = int(datetime.now().timestamp())
+    batch_size = settings.token.REFRESH_TOKEN_CLEANUP_BATCH_SIZE
+    deleted_total = 0
+
+    try:
+        # Short transactions per batch keep row locks brief for concurrent refreshes
+        while True:
+            async with UnitOfWork(task_session) as uow:
+                deleted = await uow.refresh_token.delete_expired(now, batch_size)
+
+                await uow.commit()
+
+            deleted_total += deleted
+
+            if deleted < batch_size:
+                break
+    finally:
+        # Redis connections are bound to this event loop, which asyncio.run closes,
+        # so they are dropped from the pool before the next run opens its own
+        if settings.token.REFRESH_TOKEN_BACKEND == "redis":
+            await get_redis_client().connection_pool.disconnect()
+
+    return deleted_total
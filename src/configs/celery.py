@@ -1,14 +1,71 @@
+from datetime import timedelta
+
 from celery import Celery
 from configs.config import settings
+from kombu import Queue
 
 celery = Celery(
     "tasks",
     broker=settings.celery.BROKER_URL,
+    backend=settings.celery.BACKEND,
     broker_connection_retry_on_startup=True,
 )
 
+# Transactional emails get their own queue so maintenance jobs running on
+# other workers can never hold them back
+email_route = {
+    "queue": "email",
+    "priority": settings.celery.EMAIL_TASK_PRIORITY,
+}
+
 celery.conf.update(
     imports=[
         "auth.tasks",
-    ]
-)
\ No newline at end of file
+        "outbox.tasks",
+    ],
+    task_queues=[
+        Queue("default"),
+        Queue(
+            "email",
+            queue_arguments={"x-max-priority": settings.celery.QUEUE_MAX_PRIORITY},
+        ),
+    ],
+    task_default_queue="default",
+    task_routes={
+        "auth.tasks.send_*": email_route,
+    },
+    task_annotations={
+        f"auth.tasks.{task_name}": {
+            "soft_time_limit": settings.celery.EMAIL_TASK_SOFT_TIME_LIMIT_SECONDS,
+            "time_limit": settings.celery.EMAIL_TASK_TIME_LIMIT_SECONDS,
+            # Sending is not idempotent, a redelivery after a lost worker would
+            # send the email twice
+            "acks_late": False,
+            "reject_on_worker_lost": False,
+        }
+        for task_name in (
+            "send_email_confirmation_link",
+            "send_reset_password_link",
+            "send_deactivation_account_link",
+            "send_reactivation_account_link",
+        )
+    },
+    task_queue_max_priority=settings.celery.QUEUE_MAX_PRIORITY,
+    worker_prefetch_multiplier=settings.celery.PREFETCH_MULTIPLIER,
+    task_acks_late=settings.celery.ACKS_LATE,
+    task_reject_on_worker_lost=settings.celery.ACKS_LATE,
+    task_soft_time_limit=settings.celery.TASK_SOFT_TIME_LIMIT_SECONDS,
+    task_time_limit=settings.celery.TASK_TIME_LIMIT_SECONDS,
+    beat_schedule={
+        "delete-expired-refresh-tokens": {
+            "task": "auth.tasks.delete_expired_refresh_tokens",
+            "schedule": timedelta(
+                minutes=settings.token.REFRESH_TOKEN_CLEANUP_INTERVAL_MINUTES
+            ),
+        },
+        "relay-outbox-messages": {
+            "task": "outbox.tasks.relay_outbox_messages",
+            "schedule": timedelta(seconds=settings.outbox.RELAY_INTERVAL_SECONDS),
+        },
+    },
+)
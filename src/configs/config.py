@@ -1,7 +1,8 @@
 from pathlib import Path
+from typing import List, Literal
 
 from itsdangerous import URLSafeTimedSerializer
-from pydantic import BaseModel, PositiveInt
+from pydantic import BaseModel, NonNegativeInt, PositiveFloat, PositiveInt
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 BASE_DIR = Path(__file__).parent.parent.parent
@@ -9,6 +10,20 @@ BASE_DIR = Path(__file__).parent.parent.parent
 
 class DBSettings(BaseModel):
     URL: str
+    POOL_SIZE: PositiveInt = 20
+    MAX_OVERFLOW: NonNegativeInt = 10
+    POOL_TIMEOUT_SECONDS: PositiveFloat = 30
+    # -1 keeps connections open indefinitely
+    POOL_RECYCLE_SECONDS: int = 1800
+    POOL_PRE_PING: bool = False
+    STATEMENT_CACHE_SIZE: NonNegativeInt = 100
+    PREPARED_STATEMENT_CACHE_SIZE: NonNegativeInt = 100
+    APPLICATION_NAME: str = "inwallets-api"
+    JIT: bool = False
+    READ_ONLY_AUTOCOMMIT: bool = True
+    REPLICA_URLS: List[str] = []
+    REPLICA_MAX_LAG_SECONDS: PositiveFloat = 5
+    REPLICA_LAG_CHECK_INTERVAL_SECONDS: PositiveFloat = 5
 
 
 class CryptoSettings(BaseModel):
@@ -25,6 +40,11 @@ class CryptoSettings(BaseModel):
 class TokenSettings(BaseModel):
     ACCESS_TOKEN_EXPIRE_MINUTES: PositiveInt = 15
     REFRESH_TOKNE_EXPIRE_DAYS: PositiveInt = 7
+    DEFAULT_SCOPES: List[str] = ["wallets:read", "wallets:write"]
+    REFRESH_TOKEN_CLEANUP_INTERVAL_MINUTES: PositiveInt = 60
+    REFRESH_TOKEN_CLEANUP_BATCH_SIZE: PositiveInt = 1000
+    MAX_SESSIONS_PER_USER: PositiveInt | None = None
+    REFRESH_TOKEN_BACKEND: Literal["database", "redis"] = "database"
 
 
 class CookieSettings(BaseModel):
@@ -36,6 +56,24 @@ class CookieSettings(BaseModel):
 class CelerySettings(BaseModel):
     BROKER_URL: str
     BACKEND: str
+    PREFETCH_MULTIPLIER: PositiveInt = 1
+    ACKS_LATE: bool = True
+    TASK_SOFT_TIME_LIMIT_SECONDS: PositiveInt = 300
+    TASK_TIME_LIMIT_SECONDS: PositiveInt = 360
+    EMAIL_TASK_SOFT_TIME_LIMIT_SECONDS: PositiveInt = 45
+    EMAIL_TASK_TIME_LIMIT_SECONDS: PositiveInt = 60
+    QUEUE_MAX_PRIORITY: PositiveInt = 10
+    EMAIL_TASK_PRIORITY: int = 9
+
+
+class OutboxSettings(BaseModel):
+    RELAY_INTERVAL_SECONDS: PositiveFloat = 2
+    BATCH_SIZE: PositiveInt = 100
+
+
+class RedisSettings(BaseModel):
+    # Falls back to the Celery broker when it is a Redis instance
+    URL: str | None = None
 
 
 class FlowerSettings(BaseModel):
@@ -49,6 +87,31 @@ class EmailSettings(BaseModel):
     SMTP_PORT: int
     SMTP_USER: str
     SMTP_PASSWORD: str
+    SMTP_USE_SSL: bool = True
+    SMTP_TIMEOUT_SECONDS: PositiveInt = 30
+    SMTP_POOL_SIZE: PositiveInt = 1
+    SMTP_MAX_MESSAGES_PER_CONNECTION: PositiveInt = 100
+    SMTP_IDLE_TIMEOUT_SECONDS: PositiveInt = 60
+    DELIVERY_MODE: Literal["sync", "async"] = "sync"
+    ASYNC_MAX_IN_FLIGHT: PositiveInt = 100
+    RATE_LIMIT_PER_SECOND: PositiveFloat | None = None
+
+
+class ChainsSettings(BaseModel):
+    CONFIG_PATH: Path = BASE_DIR / "src" / "wallets" / "chains.yaml"
+    RELOAD_INTERVAL_SECONDS: PositiveFloat = 5
+    # Default per-chain cap on concurrent balance lookups within a worker
+    MAX_CONCURRENT_REQUESTS: PositiveInt = 20
+
+
+class WalletsSettings(BaseModel):
+    # EIP-55 checksums memoized per worker, about 250 bytes each
+    CHECKSUM_CACHE_SIZE: NonNegativeInt = 100_000
+
+
+class BalanceSettings(BaseModel):
+    TOTALS_CACHE_TTL_SECONDS: PositiveFloat = 300
+    TOTALS_CACHE_MAX_USERS: PositiveInt = 10000
 
 
 class Settings(BaseSettings):
@@ -59,6 +122,11 @@ class Settings(BaseSettings):
     token: TokenSettings = TokenSettings()
     cookie: CookieSettings
     celery: CelerySettings
+    redis: RedisSettings = RedisSettings()
+    outbox: OutboxSettings = OutboxSettings()
+    chains: ChainsSettings = ChainsSettings()
+    wallets: WalletsSettings = WalletsSettings()
+    balance: BalanceSettings = BalanceSettings()
     flower: FlowerSettings
     email: EmailSettings
 
@@ -1,11 +1,229 @@
+import asyncio
+import itertools
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List
+
 from configs.config import settings
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
+
+
+class MonitoredAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    def _do_get(self) -> Any:
+        start = time.perf_counter()
+
+        try:
+            return super()._do_get()
+        finally:
+            wait_time = time.perf_counter() - start
+            self.checkouts += 1
+            self.wait_time_total += wait_time
+            self.wait_time_max = max(self.wait_time_max, wait_time)
+
+
+def _connect_args() -> Dict[str, Any]:
+    return {
+        "statement_cache_size": settings.db.STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": settings.db.PREPARED_STATEMENT_CACHE_SIZE,
+        "server_settings": {
+            "application_name": settings.db.APPLICATION_NAME,
+            "jit": "on" if settings.db.JIT else "off",
+        },
+    }
+
+
+def create_database_engine(url: str) -> AsyncEngine:
+    return create_async_engine(
+        url,
+        poolclass=MonitoredAsyncAdaptedQueuePool,
+        pool_size=settings.db.POOL_SIZE,
+        max_overflow=settings.db.MAX_OVERFLOW,
+        pool_timeout=settings.db.POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.db.POOL_RECYCLE_SECONDS,
+        pool_pre_ping=settings.db.POOL_PRE_PING,
+        connect_args=_connect_args(),
+    )
+
+
+def create_task_engine(url: str) -> AsyncEngine:
+    """
+    Engine for Celery tasks. Each task run drives its coroutine with
+    asyncio.run, and asyncpg connections cannot outlive the event loop they
+    were opened on, so connections are closed on release instead of pooled.
+    """
+    return create_async_engine(url, poolclass=NullPool, connect_args=_connect_args())
+
+
+def get_pool_metrics(engine: AsyncEngine) -> Dict[str, Any]:
+    pool = engine.pool
+
+    if not isinstance(pool, MonitoredAsyncAdaptedQueuePool):
+        return {}
+
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "checkouts": pool.checkouts,
+        "wait_time_total_seconds": pool.wait_time_total,
+        "wait_time_max_seconds": pool.wait_time_max,
+    }
+
+
+# A caught up replica reports no lag even if the primary has been idle for a while
+REPLICA_LAG_QUERY = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+    """
+)
+
+
+class ReplicaSessionFactory:
+    """
+    Hands out sessions bound to read replicas in round-robin order, skipping
+    replicas whose replication lag exceeds the allowed maximum, and falls back
+    to the primary when no replica is usable.
+    """
+
+    def __init__(
+        self,
+        primary_session_factory: async_sessionmaker[AsyncSession],
+        replica_engines: List[AsyncEngine],
+        max_lag_seconds: float,
+    ) -> None:
+        self._primary_session_factory = primary_session_factory
+        self._replica_engines = replica_engines
+        self._replica_session_factories = [
+            async_sessionmaker(replica_engine, expire_on_commit=False)
+            for replica_engine in replica_engines
+        ]
+        self._max_lag_seconds = max_lag_seconds
+        self._healthy_replicas = list(range(len(replica_engines)))
+        self._counter = itertools.count()
+
+    @property
+    def replica_engines(self) -> List[AsyncEngine]:
+        return self._replica_engines
+
+    def __call__(self) -> AsyncSession:
+        healthy_replicas = self._healthy_replicas
+
+        if not healthy_replicas:
+            return self._primary_session_factory()
+
+        replica = healthy_replicas[next(self._counter) % len(healthy_replicas)]
+
+        return self._replica_session_factories[replica]()
 
-engine = create_async_engine(settings.db.URL)
+    async def check_lag(self) -> None:
+        healthy_replicas = []
+
+        for replica, replica_engine in enumerate(self._replica_engines):
+            try:
+                async with replica_engine.connect() as connection:
+                    lag = await connection.scalar(REPLICA_LAG_QUERY)
+            except (SQLAlchemyError, OSError):
+                continue
+
+            if lag <= self._max_lag_seconds:
+                healthy_replicas.append(replica)
+
+        self._healthy_replicas = healthy_replicas
+
+    async def monitor_lag(self, interval_seconds: float) -> None:
+        while True:
+            await self.check_lag()
+            await asyncio.sleep(interval_seconds)
+
+
+class RequestSessionScope:
+    """
+    Lazily checks out a single primary connection and binds one session to it,
+    so every unit of work within a request shares the same connection and the
+    request's writes are committed once, when it succeeds.
+    """
+
+    def __init__(self, engine: AsyncEngine) -> None:
+        self._engine = engine
+        self._connection: AsyncConnection | None = None
+        self._session: AsyncSession | None = None
+        self._on_commit: List[Callable[[], None]] = []
+
+    @property
+    def is_open(self) -> bool:
+        return self._session is not None
+
+    async def get_session(self) -> AsyncSession:
+        if self._session is None:
+            self._connection = await self._engine.connect()
+            self._session = AsyncSession(bind=self._connection, expire_on_commit=False)
+
+        return self._session
+
+    def on_commit(self, callback: Callable[[], None]) -> None:
+        self._on_commit.append(callback)
+
+    async def commit(self) -> None:
+        if self._session is None:
+            return
+
+        await self._session.commit()
+
+        for callback in self._on_commit:
+            callback()
+
+    async def rollback(self) -> None:
+        if self._session is not None:
+            await self._session.rollback()
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+
+        if self._connection is not None:
+            await self._connection.close()
+
+
+current_request_scope: ContextVar[RequestSessionScope | None] = ContextVar(
+    "current_request_scope", default=None
+)
+
+
+engine = create_database_engine(settings.db.URL)
 
 async_session = async_sessionmaker(engine, expire_on_commit=False)
 
+task_engine = create_task_engine(settings.db.URL)
+
+task_session = async_sessionmaker(task_engine, expire_on_commit=False)
+
+replica_session = ReplicaSessionFactory(
+    async_session,
+    [create_database_engine(url) for url in settings.db.REPLICA_URLS],
+    settings.db.REPLICA_MAX_LAG_SECONDS,
+)
+
 
 class Base(DeclarativeBase):
     id: Mapped[int] = mapped_column(primary_key=True)
@@ -0,0 +1,18 @@
+from typing import AsyncIterator
+
+from database import RequestSessionScope, current_request_scope, engine
+
+
+async def request_session_scope() -> AsyncIterator[RequestSessionScope]:
+    scope = RequestSessionScope(engine)
+    token = current_request_scope.set(scope)
+
+    try:
+        yield scope
+        await scope.commit()
+    except Exception:
+        await scope.rollback()
+        raise
+    finally:
+        current_request_scope.reset(token)
+        await scope.close()
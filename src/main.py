@@ -1,17 +1,45 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+from configs.config import settings
+from database import replica_session
 from fastapi.staticfiles import StaticFiles
 from auth.router import router as auth_router
-from fastapi import APIRouter, FastAPI
+from dependencies import request_session_scope
+from fastapi import APIRouter, Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from monitoring.router import router as monitoring_router
+from wallets.dependencies import chain_registry
 from wallets.router import router as wallets_router
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    replica_lag_monitor = None
+    chain_registry_watcher = asyncio.create_task(chain_registry().watch())
+
+    if settings.db.REPLICA_URLS:
+        replica_lag_monitor = asyncio.create_task(
+            replica_session.monitor_lag(settings.db.REPLICA_LAG_CHECK_INTERVAL_SECONDS)
+        )
+
+    yield
+
+    chain_registry_watcher.cancel()
+
+    if replica_lag_monitor is not None:
+        replica_lag_monitor.cancel()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.mount("/static", StaticFiles(directory="src/static"), name="static")
 
-router = APIRouter(prefix="/api")
+router = APIRouter(prefix="/api", dependencies=[Depends(request_session_scope)])
 
 router.include_router(auth_router)
 router.include_router(wallets_router)
+router.include_router(monitoring_router)
 
 app.include_router(router)
 
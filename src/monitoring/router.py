@@ -0,0 +1,23 @@
+from typing import Annotated, Any, Dict
+
+from auth.dependencies import current_user
+from database import engine, get_pool_metrics, replica_session
+from fastapi import APIRouter, Security
+from monitoring.schemas import DBPoolMetricsSchema, DBPoolsMetricsSchema
+
+router = APIRouter(prefix="/monitoring", tags=["monitoring"])
+
+
+@router.get("/db-pool/", status_code=200)
+async def get_db_pool_metrics(
+    user_data: Annotated[
+        Dict[str, Any], Security(current_user, scopes=["monitoring:read"])
+    ],
+) -> DBPoolsMetricsSchema:
+    return DBPoolsMetricsSchema(
+        primary=DBPoolMetricsSchema(**get_pool_metrics(engine)),
+        replicas=[
+            DBPoolMetricsSchema(**get_pool_metrics(replica_engine))
+            for replica_engine in replica_session.replica_engines
+        ],
+    )
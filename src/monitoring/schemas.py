@@ -0,0 +1,18 @@
+from typing import List
+
+from pydantic import BaseModel, Field
+
+
+class DBPoolMetricsSchema(BaseModel):
+    size: int = Field(examples=[20])
+    checked_in: int = Field(examples=[18])
+    checked_out: int = Field(examples=[2])
+    overflow: int = Field(examples=[-18])
+    checkouts: int = Field(examples=[1500])
+    wait_time_total_seconds: float = Field(examples=[0.42])
+    wait_time_max_seconds: float = Field(examples=[0.015])
+
+
+class DBPoolsMetricsSchema(BaseModel):
+    primary: DBPoolMetricsSchema
+    replicas: List[DBPoolMetricsSchema]
@@ -0,0 +1,12 @@
+from typing import Any
+
+from database import Base
+from sqlalchemy import JSON
+from sqlalchemy.orm import Mapped, mapped_column
+
+
+class OutboxMessage(Base):
+    __tablename__ = "outbox_messages"
+
+    task_name: Mapped[str] = mapped_column(nullable=False)
+    args: Mapped[list[Any]] = mapped_column(JSON, nullable=False)
@@ -0,0 +1,35 @@
+from typing import Any, List, Sequence
+
+from outbox.models import OutboxMessage
+from repository import SQLAlchemyRepository
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class OutboxRepository(SQLAlchemyRepository[OutboxMessage]):
+    def __init__(self, session: AsyncSession) -> None:
+        super().__init__(session=session, model_cls=OutboxMessage)
+
+    async def enqueue(self, task_name: str, args: List[Any]) -> OutboxMessage:
+        return await self.create({"task_name": task_name, "args": args})
+
+    async def claim_batch(self, limit: int) -> Sequence[OutboxMessage]:
+        # Concurrent relays skip rows another relay is already publishing
+        statement = (
+            select(self._model_cls)
+            .order_by(self._model_cls.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await self._session.execute(statement)
+
+        return result.scalars().all()
+
+    async def delete_multiple(self, message_ids: List[int]) -> None:
+        statement = (
+            delete(self._model_cls)
+            .where(self._model_cls.id.in_(message_ids))
+            .execution_options(synchronize_session=False)
+        )
+
+        await self._session.execute(statement)
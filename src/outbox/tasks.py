@@ -0,0 +1,47 @@
+import asyncio
+
+from celery.utils.log import get_task_logger
+from configs.celery import celery
+from configs.config import settings
+from database import task_session
+from unit_of_work import UnitOfWork
+
+logger = get_task_logger(__name__)
+
+
+@celery.task
+def relay_outbox_messages() -> int:
+    relayed = asyncio.run(_relay_outbox_messages())
+
+    if relayed:
+        logger.info("Relayed %d outbox messages", relayed)
+
+    return relayed
+
+
+async def _relay_outbox_messages() -> int:
+    batch_size = settings.outbox.BATCH_SIZE
+    relayed_total = 0
+
+    while True:
+        async with UnitOfWork(task_session) as uow:
+            messages = await uow.outbox.claim_batch(batch_size)
+
+            if messages:
+                # Publishing happens before the commit, so delivery is at least once
+                with celery.producer_or_acquire() as producer:
+                    for message in messages:
+                        celery.send_task(
+                            message.task_name, args=message.args, producer=producer
+                        )
+
+                await uow.outbox.delete_multiple([message.id for message in messages])
+
+                await uow.commit()
+
+        relayed_total += len(messages)
+
+        if len(messages) < batch_size:
+            break
+
+    return relayed_total
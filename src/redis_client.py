@@ -0,0 +1,11 @@
+from functools import cache
+
+from configs.config import settings
+from redis.asyncio import Redis
+
+
+@cache
+def get_redis_client() -> Redis:
+    return Redis.from_url(
+        settings.redis.URL or settings.celery.BROKER_URL, decode_responses=True
+    )
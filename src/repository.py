@@ -2,8 +2,10 @@ from abc import ABC, abstractmethod
 from typing import Any, Dict, Generic, Sequence, TypeVar
 
 from database import Base
-from sqlalchemy import select
+from sqlalchemy import Row, func, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
 
 ModelType = TypeVar("ModelType", bound=Base)
 
@@ -17,6 +19,10 @@ class AbstractRepository(ABC, Generic[ModelType]):
     async def create_multiple(self, data: Dict[str, Any]) -> Sequence[ModelType]:
         raise NotImplementedError
 
+    @abstractmethod
+    async def create_if_not_exists(self, data: Dict[str, Any]) -> ModelType | None:
+        raise NotImplementedError
+
     @abstractmethod
     async def get_by(self, **filters: Any) -> ModelType | None:
         raise NotImplementedError
@@ -25,6 +31,24 @@ class AbstractRepository(ABC, Generic[ModelType]):
     async def get_multiple_by(self, **filters: Any) -> Sequence[ModelType]:
         raise NotImplementedError
 
+    @abstractmethod
+    async def exists(self, **filters: Any) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def count(self, **filters: Any) -> int:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_columns(
+        self, *columns: InstrumentedAttribute, **filters: Any
+    ) -> Sequence[Row]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def max(self, column: InstrumentedAttribute, **filters: Any) -> Any | None:
+        raise NotImplementedError
+
     @abstractmethod
     async def update(self, obj_to_update: ModelType, data: Dict[str, Any]) -> ModelType:
         raise NotImplementedError
@@ -55,6 +79,22 @@ class SQLAlchemyRepository(Generic[ModelType]):
 
         return new_objs
 
+    async def create_if_not_exists(self, data: Dict[str, Any]) -> ModelType | None:
+        """
+        Inserts a row in a single statement, relying on the table's unique
+        constraints. Returns None if the row conflicts with an existing one.
+        """
+        statement = (
+            insert(self._model_cls)
+            .values(**data)
+            .on_conflict_do_nothing()
+            .returning(self._model_cls)
+        )
+        orm_statement = select(self._model_cls).from_statement(statement)
+        result = await self._session.execute(orm_statement)
+
+        return result.scalar_one_or_none()
+
     async def get_by(self, **filters: Any) -> ModelType | None:
         statement = select(self._model_cls).filter_by(**filters)
         result = await self._session.execute(statement)
@@ -67,6 +107,34 @@ class SQLAlchemyRepository(Generic[ModelType]):
 
         return result.scalars().all()
 
+    async def exists(self, **filters: Any) -> bool:
+        statement = select(select(self._model_cls).filter_by(**filters).exists())
+        result = await self._session.execute(statement)
+
+        return result.scalar_one()
+
+    async def count(self, **filters: Any) -> int:
+        statement = (
+            select(func.count()).select_from(self._model_cls).filter_by(**filters)
+        )
+        result = await self._session.execute(statement)
+
+        return result.scalar_one()
+
+    async def get_columns(
+        self, *columns: InstrumentedAttribute, **filters: Any
+    ) -> Sequence[Row]:
+        statement = select(*columns).filter_by(**filters)
+        result = await self._session.execute(statement)
+
+        return result.all()
+
+    async def max(self, column: InstrumentedAttribute, **filters: Any) -> Any | None:
+        statement = select(func.max(column)).filter_by(**filters)
+        result = await self._session.execute(statement)
+
+        return result.scalar_one()
+
     async def update(self, obj_to_update: ModelType, data: Dict[str, Any]) -> ModelType:
         for key, value in data.items():
             setattr(obj_to_update, key, value)
@@ -1,13 +1,30 @@
 from abc import ABC, abstractmethod
-from typing import Self
-
-from auth.repository import RefreshTokenRepository, UserRepository
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from typing import Callable, List, Self
+
+from auth.repository import (
+    AbstractRefreshTokenRepository,
+    RedisRefreshTokenRepository,
+    RefreshTokenRepository,
+    UserRepository,
+)
+from configs.config import settings
+from database import current_request_scope
+from outbox.repository import OutboxRepository
+from redis_client import get_redis_client
+from sqlalchemy.ext.asyncio import AsyncSession
 from wallets.repository import WalletGroupRepository, WalletRepository
 
+# Autocommit skips the BEGIN/ROLLBACK round trips entirely, otherwise asyncpg
+# opens the transaction as BEGIN READ ONLY
+READ_ONLY_OPTIONS = (
+    {"isolation_level": "AUTOCOMMIT"}
+    if settings.db.READ_ONLY_AUTOCOMMIT
+    else {"postgresql_readonly": True}
+)
+
 
 class AbstractUnitOfWork(ABC):
-    def __init__(self, session_factory: async_sessionmaker[AsyncSession]) -> None:
+    def __init__(self, session_factory: Callable[[], AsyncSession]) -> None:
         raise NotImplementedError
 
     @abstractmethod
@@ -26,14 +43,23 @@ class AbstractUnitOfWork(ABC):
     async def rollback(self) -> None:
         raise NotImplementedError
 
+    @abstractmethod
+    def on_commit(self, callback: Callable[[], None]) -> None:
+        raise NotImplementedError
+
 
 class UnitOfWork(AbstractUnitOfWork):
-    def __init__(self, session_factory: async_sessionmaker[AsyncSession]) -> None:
+    def __init__(
+        self, session_factory: Callable[[], AsyncSession], read_only: bool = False
+    ) -> None:
         self._session_factory = session_factory
+        self._read_only = read_only
         self._user_repo = None
         self._refresh_token_repo = None
         self._wallet_repo = None
         self._wallet_group_repo = None
+        self._outbox_repo = None
+        self._on_commit: List[Callable[[], None]] = []
 
     @property
     def user(self) -> UserRepository:
@@ -43,9 +69,14 @@ class UnitOfWork(AbstractUnitOfWork):
         return self._user_repo
 
     @property
-    def refresh_token(self) -> RefreshTokenRepository:
+    def refresh_token(self) -> AbstractRefreshTokenRepository:
         if self._refresh_token_repo is None:
-            self._refresh_token_repo = RefreshTokenRepository(self._session)
+            if settings.token.REFRESH_TOKEN_BACKEND == "redis":
+                self._refresh_token_repo = RedisRefreshTokenRepository(
+                    get_redis_client()
+                )
+            else:
+                self._refresh_token_repo = RefreshTokenRepository(self._session)
 
         return self._refresh_token_repo
 
@@ -63,19 +94,69 @@ class UnitOfWork(AbstractUnitOfWork):
 
         return self._wallet_group_repo
 
+    @property
+    def outbox(self) -> OutboxRepository:
+        if self._outbox_repo is None:
+            self._outbox_repo = OutboxRepository(self._session)
+
+        return self._outbox_repo
+
     async def __aenter__(self) -> Self:
+        scope = current_request_scope.get()
+
+        # Reads after a write in the same request must see it, so they join the
+        # request session instead of going to a replica
+        if scope is not None and (not self._read_only or scope.is_open):
+            self._scope = scope
+            self._session = await scope.get_session()
+            self._shared = True
+
+            return self
+
+        self._shared = False
         self._session = self._session_factory()
 
+        if self._read_only:
+            # Nothing is written, so there is nothing to flush before queries
+            self._session.autoflush = False
+            await self._session.connection(execution_options=READ_ONLY_OPTIONS)
+
         return self
 
     async def __aexit__(self, exc_type, exc_value, traceback) -> None:
-        if exc_type is not None:
+        if self._shared:
+            # The request scope closes the session and releases the connection
+            if exc_type is not None:
+                await self.rollback()
+
+            return
+
+        if exc_type is not None and not self._read_only:
             await self.rollback()
 
         await self._session.close()
 
     async def commit(self) -> None:
+        if self._read_only and not self._shared:
+            raise RuntimeError("Read-only unit of work cannot be committed")
+
+        if self._shared:
+            # Flushed so constraint violations still surface here, the request
+            # scope commits once after the endpoint succeeds
+            await self._session.flush()
+            return
+
         await self._session.commit()
 
+        for callback in self._on_commit:
+            callback()
+
     async def rollback(self) -> None:
         await self._session.rollback()
+
+    def on_commit(self, callback: Callable[[], None]) -> None:
+        """Runs the callback once the writes are actually committed."""
+        if self._shared:
+            self._scope.on_commit(callback)
+        else:
+            self._on_commit.append(callback)
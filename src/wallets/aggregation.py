@@ -0,0 +1,82 @@
+"""
+Vectorized portfolio totals. Balance cells (one per wallet and chain) are
+turned into a float64 matrix of USD amounts once, then summed per key with
+np.bincount, which keeps 100k cells in the low milliseconds.
+
+Totals are float64: they combine values priced in floating point anyway,
+while the per-cell balances stay exact (see WalletBalanceSchema).
+"""
+
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+from wallets.schemas import WalletBalanceSchema
+
+AMOUNT_FIELDS = ("native_in_usd", "usdt_balance", "usdc_balance")
+
+TOTAL_FIELDS = (*AMOUNT_FIELDS, "total_in_usd")
+
+
+def balance_amounts(balances: Sequence[WalletBalanceSchema]) -> np.ndarray:
+    """
+    Returns an (n, 3) matrix of native balance in USD, USDT and USDC units.
+    """
+    native_balance = np.fromiter(
+        (balance.native_balance_raw for balance in balances),
+        dtype=np.float64,
+        count=len(balances),
+    )
+    native_decimals = np.fromiter(
+        (balance.native_decimals for balance in balances),
+        dtype=np.float64,
+        count=len(balances),
+    )
+    native_usd_price = np.fromiter(
+        (balance.native_usd_price for balance in balances),
+        dtype=np.float64,
+        count=len(balances),
+    )
+
+    return np.column_stack(
+        (
+            native_balance / 10.0**native_decimals * native_usd_price,
+            _token_amounts(balances, "usdt"),
+            _token_amounts(balances, "usdc"),
+        )
+    )
+
+
+def sum_by(keys: np.ndarray, amounts: np.ndarray, size: int) -> np.ndarray:
+    """
+    Sums the rows of `amounts` that share a key in [0, size) and appends the
+    total in USD, returning a (size, 4) matrix.
+    """
+    totals = np.column_stack(
+        [
+            np.bincount(keys, weights=amounts[:, column], minlength=size)
+            for column in range(amounts.shape[1])
+        ]
+    ).reshape(size, amounts.shape[1])
+
+    return np.column_stack((totals, totals.sum(axis=1)))
+
+
+def totals_to_dicts(totals: np.ndarray) -> List[Dict[str, Any]]:
+    return [dict(zip(TOTAL_FIELDS, row)) for row in np.round(totals, 6).tolist()]
+
+
+def _token_amounts(balances: Sequence[WalletBalanceSchema], token: str) -> np.ndarray:
+    raw_field, decimals_field = f"{token}_balance_raw", f"{token}_decimals"
+
+    raw = np.fromiter(
+        (getattr(balance, raw_field) or 0 for balance in balances),
+        dtype=np.float64,
+        count=len(balances),
+    )
+    decimals = np.fromiter(
+        (getattr(balance, decimals_field) or 0 for balance in balances),
+        dtype=np.float64,
+        count=len(balances),
+    )
+
+    return raw / 10.0**decimals
@@ -0,0 +1,107 @@
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, FrozenSet, NamedTuple, Tuple
+
+GroupTotals = Dict[int | None, Dict[str, float]]
+
+
+class CachedTotals(NamedTuple):
+    chains: FrozenSet[str]
+    computed_at: datetime
+    expires_at: float
+    totals: Dict[str, float]
+
+
+UserTotals = Dict[Tuple[FrozenSet[str], int | None], CachedTotals]
+
+
+class BalanceTotalsCache:
+    """
+    Per-worker TTL cache of each user's latest balance totals per wallet group,
+    keyed by the set of chain names they were computed over and the group id
+    (None for ungrouped wallets). Least recently used users are evicted once
+    max_users is reached.
+    """
+
+    def __init__(self, ttl_seconds: float, max_users: int) -> None:
+        self._ttl_seconds = ttl_seconds
+        self._max_users = max_users
+        self._entries: OrderedDict[int, UserTotals] = OrderedDict()
+
+    def get(self, user_id: int) -> Dict[int | None, CachedTotals]:
+        """
+        The most recently computed totals of each group, whatever chains they
+        cover.
+        """
+        user_totals = self._entries.get(user_id)
+
+        if user_totals is None:
+            return {}
+
+        now = time.monotonic()
+        expired = [
+            key for key, cached in user_totals.items() if cached.expires_at <= now
+        ]
+        for key in expired:
+            del user_totals[key]
+
+        if not user_totals:
+            del self._entries[user_id]
+            return {}
+
+        self._entries.move_to_end(user_id)
+
+        latest: Dict[int | None, CachedTotals] = {}
+        for (_, group_id), cached in user_totals.items():
+            if (
+                group_id not in latest
+                or cached.computed_at > latest[group_id].computed_at
+            ):
+                latest[group_id] = cached
+
+        return latest
+
+    def set(
+        self, user_id: int, chains: FrozenSet[str], group_totals: GroupTotals
+    ) -> None:
+        """Replaces every group's totals computed over the same chains."""
+        user_totals = {
+            key: cached
+            for key, cached in self._entries.get(user_id, {}).items()
+            if key[0] != chains
+        }
+        for group_id, totals in group_totals.items():
+            user_totals[(chains, group_id)] = self._build(chains, totals)
+
+        self._store(user_id, user_totals)
+
+    def update(
+        self,
+        user_id: int,
+        chains: FrozenSet[str],
+        group_id: int | None,
+        totals: Dict[str, float],
+    ) -> None:
+        user_totals = dict(self._entries.get(user_id, {}))
+        user_totals[(chains, group_id)] = self._build(chains, totals)
+
+        self._store(user_id, user_totals)
+
+    def invalidate(self, user_id: int) -> None:
+        self._entries.pop(user_id, None)
+
+    def _build(self, chains: FrozenSet[str], totals: Dict[str, float]) -> CachedTotals:
+        return CachedTotals(
+            chains=chains,
+            computed_at=datetime.now(timezone.utc),
+            expires_at=time.monotonic() + self._ttl_seconds,
+            totals=totals,
+        )
+
+    def _store(self, user_id: int, user_totals: UserTotals) -> None:
+        self._entries[user_id] = user_totals
+        self._entries.move_to_end(user_id)
+
+        while len(self._entries) > self._max_users:
+            self._entries.popitem(last=False)
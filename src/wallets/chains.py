@@ -0,0 +1,235 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, NamedTuple, Set, Tuple
+
+import yaml
+from eth_typing import URI, ChecksumAddress
+from wallets.schemas import ChainSchema, ChainsSchema
+from wallets.utils import address_to_bytes, bytes_to_checksum_address
+from web3 import AsyncHTTPProvider, AsyncWeb3
+from web3._utils.request import async_cache_and_return_session
+
+logger = logging.getLogger(__name__)
+
+# web3 times RPC calls out after 10 seconds, so by then no request still uses
+# the session of an endpoint that was removed from the file
+RETIRED_ENDPOINT_CLOSE_DELAY_SECONDS = 15
+
+
+@dataclass(slots=True, frozen=True)
+class RPCEndpoint:
+    url: str
+    web3: AsyncWeb3 = field(compare=False, repr=False)
+
+
+@dataclass(slots=True, frozen=True)
+class Token:
+    symbol: str
+    address: ChecksumAddress
+
+
+@dataclass(slots=True, frozen=True)
+class Chain:
+    name: str
+    currency: str
+    native_decimals: int
+    logo: str
+    rpc_endpoints: Tuple[RPCEndpoint, ...]
+    usdt: Token | None
+    usdc: Token | None
+    max_concurrent_requests: int
+    # Caps in-flight RPC work against this chain across all requests of a worker
+    semaphore: asyncio.Semaphore = field(compare=False, repr=False)
+
+
+class ChainRegistrySnapshot(NamedTuple):
+    mtime_ns: int
+    raw_chains: Dict[str, Dict[str, Any]]
+    chains: Dict[str, Chain]
+    chains_response: bytes
+
+
+class ChainRegistry:
+    """
+    Chains loaded from a YAML file into typed structures. While watch runs, the
+    file is re-read in a worker thread when its modification time changes and
+    the new snapshot replaces the old one in a single assignment, so requests
+    only ever read the current snapshot. Unchanged chains, RPC endpoints and
+    semaphores are carried over to the new snapshot.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        reload_interval_seconds: float,
+        max_concurrent_requests: int,
+    ) -> None:
+        self._path = path
+        self._reload_interval_seconds = reload_interval_seconds
+        self._max_concurrent_requests = max_concurrent_requests
+        self._snapshot = self._load(self._path.stat().st_mtime_ns, None)
+        self._failed_mtime_ns: int | None = None
+        self._retired_urls: List[Tuple[float, Set[str]]] = []
+
+    @property
+    def chains(self) -> Mapping[str, Chain]:
+        return self._snapshot.chains
+
+    @property
+    def chains_response(self) -> bytes:
+        return self._snapshot.chains_response
+
+    def get(self, name: str) -> Chain | None:
+        return self._snapshot.chains.get(name)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._snapshot.chains
+
+    async def watch(self) -> None:
+        """Reloads the file whenever it changes, until cancelled."""
+        while True:
+            await asyncio.sleep(self._reload_interval_seconds)
+
+            await self.reload_if_changed()
+            await self._close_retired_endpoints()
+
+    async def reload_if_changed(self) -> bool:
+        try:
+            stat = await asyncio.to_thread(self._path.stat)
+        except OSError:
+            logger.exception("Chain registry %s is not readable", self._path)
+            return False
+
+        if stat.st_mtime_ns in (self._snapshot.mtime_ns, self._failed_mtime_ns):
+            return False
+
+        previous = self._snapshot
+
+        try:
+            snapshot = await asyncio.to_thread(self._load, stat.st_mtime_ns, previous)
+        except (OSError, yaml.YAMLError, KeyError, TypeError, ValueError):
+            # Keep serving the previous chains until the file is fixed
+            logger.exception("Failed to reload chain registry %s", self._path)
+            self._failed_mtime_ns = stat.st_mtime_ns
+            return False
+
+        self._snapshot = snapshot
+
+        retired_urls = _endpoint_urls(previous) - _endpoint_urls(snapshot)
+        if retired_urls:
+            self._retired_urls.append(
+                (time.monotonic() + RETIRED_ENDPOINT_CLOSE_DELAY_SECONDS, retired_urls)
+            )
+
+        return True
+
+    async def _close_retired_endpoints(self) -> None:
+        now = time.monotonic()
+        due = [urls for close_at, urls in self._retired_urls if close_at <= now]
+        self._retired_urls = [
+            (close_at, urls) for close_at, urls in self._retired_urls if close_at > now
+        ]
+
+        # An endpoint added back to the file in the meantime is still in use
+        current_urls = _endpoint_urls(self._snapshot)
+
+        for url in set().union(*due) - current_urls:
+            # web3 v6 providers have no close method; their aiohttp session is
+            # cached per thread and URL, and requests run on this thread
+            session = await async_cache_and_return_session(URI(url))
+            await session.close()
+
+    def _load(
+        self, mtime_ns: int, previous: ChainRegistrySnapshot | None
+    ) -> ChainRegistrySnapshot:
+        with self._path.open() as f:
+            raw_chains: Dict[str, Dict[str, Any]] = yaml.safe_load(f)["chains"]
+
+        previous_chains = {} if previous is None else previous.chains
+        previous_endpoints = (
+            {}
+            if previous is None
+            else {
+                endpoint.url: endpoint
+                for chain in previous.chains.values()
+                for endpoint in chain.rpc_endpoints
+            }
+        )
+
+        chains: Dict[str, Chain] = {}
+        for name, chain_info in raw_chains.items():
+            if previous is not None and previous.raw_chains.get(name) == chain_info:
+                chains[name] = previous_chains[name]
+            else:
+                chains[name] = self._build_chain(
+                    name, chain_info, previous_chains.get(name), previous_endpoints
+                )
+
+        chains_response = (
+            ChainsSchema(
+                chains=[
+                    ChainSchema(name=chain.name, symbol=chain.currency, logo=chain.logo)
+                    for chain in chains.values()
+                ]
+            )
+            .model_dump_json()
+            .encode()
+        )
+
+        return ChainRegistrySnapshot(mtime_ns, raw_chains, chains, chains_response)
+
+    def _build_chain(
+        self,
+        name: str,
+        chain_info: Dict[str, Any],
+        previous_chain: Chain | None,
+        previous_endpoints: Dict[str, RPCEndpoint],
+    ) -> Chain:
+        max_concurrent_requests = chain_info.get(
+            "max_concurrent_requests", self._max_concurrent_requests
+        )
+
+        # Requests holding a permit of the old semaphore keep counting against
+        # the cap as long as it is unchanged
+        if (
+            previous_chain is not None
+            and previous_chain.max_concurrent_requests == max_concurrent_requests
+        ):
+            semaphore = previous_chain.semaphore
+        else:
+            semaphore = asyncio.Semaphore(max_concurrent_requests)
+
+        return Chain(
+            name=name,
+            currency=chain_info["currency"],
+            native_decimals=chain_info.get("native_decimals", 18),
+            logo=chain_info["chain_logo"],
+            rpc_endpoints=tuple(
+                previous_endpoints.get(url)
+                or RPCEndpoint(url=url, web3=AsyncWeb3(AsyncHTTPProvider(url)))
+                for url in chain_info["rpc"]
+            ),
+            usdt=self._build_token("USDT", chain_info.get("usdt_contract_address")),
+            usdc=self._build_token("USDC", chain_info.get("usdc_contract_address")),
+            max_concurrent_requests=max_concurrent_requests,
+            semaphore=semaphore,
+        )
+
+    def _build_token(self, symbol: str, address: str | None) -> Token | None:
+        if address is None:
+            return None
+
+        return Token(
+            symbol=symbol, address=bytes_to_checksum_address(address_to_bytes(address))
+        )
+
+
+def _endpoint_urls(snapshot: ChainRegistrySnapshot) -> Set[str]:
+    return {
+        endpoint.url
+        for chain in snapshot.chains.values()
+        for endpoint in chain.rpc_endpoints
+    }
@@ -1,18 +1,44 @@
+from configs.config import settings
 from unit_of_work import UnitOfWork
-from wallets.services import BalanceService, WalletGroupService, WalletImporterService, WalletService
+from wallets.cache import BalanceTotalsCache
+from wallets.chains import ChainRegistry
+from wallets.services import (
+    BalanceService,
+    WalletGroupService,
+    WalletImporterService,
+    WalletService,
+)
+
+# Services hold no per-request state, so they are built once at startup
+_chain_registry = ChainRegistry(
+    settings.chains.CONFIG_PATH,
+    settings.chains.RELOAD_INTERVAL_SECONDS,
+    settings.chains.MAX_CONCURRENT_REQUESTS,
+)
+_totals_cache = BalanceTotalsCache(
+    settings.balance.TOTALS_CACHE_TTL_SECONDS, settings.balance.TOTALS_CACHE_MAX_USERS
+)
+_wallet_service = WalletService(UnitOfWork, _totals_cache)
+_wallet_importer_service = WalletImporterService(UnitOfWork, _totals_cache)
+_wallet_group_service = WalletGroupService(UnitOfWork, _totals_cache)
+_balance_service = BalanceService(UnitOfWork, _chain_registry, _totals_cache)
 
 
 def wallet_service() -> WalletService:
-    return WalletService(UnitOfWork)
+    return _wallet_service
 
 
 def wallet_importer_service() -> WalletImporterService:
-    return WalletImporterService(UnitOfWork)
+    return _wallet_importer_service
 
 
 def wallet_group_service() -> WalletGroupService:
-    return WalletGroupService(UnitOfWork)
+    return _wallet_group_service
 
 
 def balance_service() -> BalanceService:
-    return BalanceService(UnitOfWork)
+    return _balance_service
+
+
+def chain_registry() -> ChainRegistry:
+    return _chain_registry
@@ -0,0 +1,28 @@
+"""
+Minimal ERC-20 call encoding for the two read-only calls the balance path
+makes, so that it doesn't go through web3's contract and ABI machinery.
+"""
+
+# First 4 bytes of keccak256("balanceOf(address)") and keccak256("decimals()")
+BALANCE_OF_SELECTOR = bytes.fromhex("70a08231")
+DECIMALS_SELECTOR = bytes.fromhex("313ce567")
+
+ADDRESS_PADDING = bytes(12)
+
+
+def encode_balance_of(address: bytes) -> bytes:
+    if len(address) != 20:
+        raise ValueError("Address must be 20 bytes long")
+
+    return BALANCE_OF_SELECTOR + ADDRESS_PADDING + address
+
+
+def encode_decimals() -> bytes:
+    return DECIMALS_SELECTOR
+
+
+def decode_uint256(data: bytes) -> int:
+    if len(data) != 32:
+        raise ValueError(f"Expected a 32-byte uint256, got {len(data)} bytes")
+
+    return int.from_bytes(data, "big")
@@ -1,5 +1,5 @@
 from database import Base
-from sqlalchemy import ForeignKey, UniqueConstraint
+from sqlalchemy import ForeignKey, LargeBinary, String, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from wallets.schemas import Color
 
@@ -8,7 +8,8 @@ class Wallet(Base):
     __tablename__ = "wallets"
 
     number: Mapped[int] = mapped_column(nullable=False)
-    address: Mapped[str] = mapped_column(nullable=False, unique=True)
+    address: Mapped[bytes] = mapped_column(LargeBinary(20), nullable=False, unique=True)
+    checksum_address: Mapped[str] = mapped_column(String(42), nullable=False)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
     group_id: Mapped[int] = mapped_column(ForeignKey("wallet_groups.id"), nullable=True)
 
@@ -21,7 +22,7 @@ class Wallet(Base):
 class WalletGroup(Base):
     __tablename__ = "wallet_groups"
 
-    name: Mapped[str] = mapped_column(nullable=False, unique=True)
+    name: Mapped[str] = mapped_column(nullable=False)
     color: Mapped[Color] = mapped_column(nullable=False, default=Color.RED)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
 
@@ -1,6 +1,16 @@
 from typing import Any, Dict, List, Sequence
 
-from sqlalchemy import delete, select
+from sqlalchemy import (
+    ARRAY,
+    Integer,
+    Row,
+    any_,
+    bindparam,
+    delete,
+    func,
+    select,
+    update,
+)
 
 from repository import SQLAlchemyRepository
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -11,8 +21,12 @@ class WalletRepository(SQLAlchemyRepository[Wallet]):
     def __init__(self, session: AsyncSession) -> None:
         super().__init__(session=session, model_cls=Wallet)
 
-    async def filter_by_wallet_ids(self, wallet_ids: List[int]) -> Sequence[Wallet]:
-        statement = select(self._model_cls).filter(self._model_cls.id.in_(wallet_ids))
+    async def filter_by_wallet_ids(
+        self, wallet_ids: List[int], user_id: int
+    ) -> Sequence[Wallet]:
+        statement = select(self._model_cls).filter(
+            self._model_cls.id.in_(wallet_ids), self._model_cls.user_id == user_id
+        )
         result = await self._session.execute(statement)
 
         return result.scalars().all()
@@ -30,12 +44,67 @@ class WalletRepository(SQLAlchemyRepository[Wallet]):
 
     async def delete_multiple_wallets(
         self, wallet_ids: List[int], user_id: int
-    ) -> None:
-        statement = delete(self._model_cls).where(self._model_cls.id.in_(wallet_ids))
+    ) -> int:
+        statement = (
+            delete(self._model_cls)
+            .where(
+                self._model_cls.id.in_(wallet_ids), self._model_cls.user_id == user_id
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+        result = await self._session.execute(statement)
+
+        return result.rowcount
 
-        await self._session.execute(statement)
+    async def assign_group(
+        self, wallet_ids: List[int], wallet_group_id: int, user_id: int
+    ) -> int:
+        """
+        Moves the user's wallets into a group they own in a single UPDATE,
+        returning the number of wallets moved.
+        """
+        group_is_owned = (
+            select(WalletGroup.id)
+            .where(WalletGroup.id == wallet_group_id, WalletGroup.user_id == user_id)
+            .exists()
+        )
+        statement = (
+            update(self._model_cls)
+            .where(
+                # One array parameter instead of one bind per id
+                self._model_cls.id
+                == any_(bindparam("wallet_ids", wallet_ids, type_=ARRAY(Integer))),
+                self._model_cls.user_id == user_id,
+                group_is_owned,
+            )
+            .values(group_id=wallet_group_id)
+            .execution_options(synchronize_session=False)
+        )
+
+        result = await self._session.execute(statement)
+
+        return result.rowcount
 
 
 class WalletGroupRepository(SQLAlchemyRepository[WalletGroup]):
     def __init__(self, session: AsyncSession) -> None:
         super().__init__(session=session, model_cls=WalletGroup)
+
+    async def get_summaries(self, user_id: int) -> Sequence[Row]:
+        statement = (
+            select(
+                self._model_cls.id,
+                self._model_cls.name,
+                self._model_cls.color,
+                func.count(Wallet.id).label("wallet_count"),
+            )
+            .select_from(self._model_cls)
+            .outerjoin(Wallet, Wallet.group_id == self._model_cls.id)
+            .where(self._model_cls.user_id == user_id)
+            .group_by(self._model_cls.id)
+            .order_by(self._model_cls.id)
+        )
+        result = await self._session.execute(statement)
+
+        return result.all()
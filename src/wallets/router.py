@@ -1,31 +1,34 @@
-from typing import Annotated, List, Sequence
+from typing import Annotated, Any, Dict, List, Sequence
 
 from fastapi.staticfiles import StaticFiles
 
-from auth.dependencies import get_access_token, token_service
-from auth.services import TokenService
-from fastapi import APIRouter, Depends, HTTPException, UploadFile
-from wallets.config import CHAINS
+from auth.dependencies import current_user, get_access_token
+from fastapi import APIRouter, Depends, HTTPException, Response, Security, UploadFile
+from wallets.chains import ChainRegistry
 from wallets.dependencies import (
     balance_service,
+    chain_registry,
     wallet_group_service,
     wallet_importer_service,
     wallet_service,
 )
 from wallets.models import Wallet, WalletGroup
 from wallets.schemas import (
-    ChainsSchema,
+    BalanceSummarySchema,
+    ChainBalanceSchema,
     ChainSchema,
+    ChainsSchema,
     WalletCreateSchema,
     WalletDeleteSchema,
+    WalletGroupAssignSchema,
     WalletGroupCreateSchema,
     WalletGroupPatchSchema,
     WalletGroupPutSchema,
     WalletGroupSchema,
+    WalletGroupSummarySchema,
     WalletPatchSchema,
     WalletPutSchema,
     WalletSchema,
-    ChainBalanceSchema,
 )
 from wallets.services import (
     BalanceService,
@@ -39,26 +42,24 @@ router = APIRouter(prefix="/wallets", tags=["wallets"])
 
 @router.get("/", status_code=200, response_model=List[WalletSchema])
 async def get_wallets(
-    access_token: Annotated[str, Depends(get_access_token)],
-    token_service: Annotated[TokenService, Depends(token_service)],
+    user_data: Annotated[
+        Dict[str, Any], Security(current_user, scopes=["wallets:read"])
+    ],
     wallet_service: Annotated[WalletService, Depends(wallet_service)],
 ) -> Sequence[Wallet]:
-    user_data = await token_service.check_access_token(access_token)
-
     return await wallet_service.get_wallets(user_data["id"])
 
 
 @router.post("/", status_code=201, response_model=List[WalletSchema])
 async def import_wallets(
-    access_token: Annotated[str, Depends(get_access_token)],
-    token_service: Annotated[TokenService, Depends(token_service)],
+    user_data: Annotated[
+        Dict[str, Any], Security(current_user, scopes=["wallets:write"])
+    ],
     wallet_importer_service: Annotated[
         WalletImporterService, Depends(wallet_importer_service)
     ],
     wallets: List[WalletCreateSchema],
 ) -> Sequence[Wallet]:
-    user_data = await token_service.check_access_token(access_token)
-
     if not wallets:
         raise HTTPException(status_code=400, detail="No wallets to import")
 
@@ -67,13 +68,12 @@ async def import_wallets(
 
 @router.post("/xlsx/", status_code=201, response_model=List[WalletSchema])
 async def import_wallets_xlsx(
-    access_token: Annotated[str, Depends(get_access_token)],
-    token_service: Annotated[TokenService, Depends(token_service)],
+    user_data: Annotated[
+        Dict[str, Any], Security(current_user, scopes=["wallets:write"])
+    ],
     wallet_service: Annotated[WalletImporterService, Depends(wallet_importer_service)],
     wallets_xlsx: UploadFile,
 ) -> Sequence[Wallet]:
-    user_data = await token_service.check_access_token(access_token)
-
     if not wallets_xlsx:
         raise HTTPException(status_code=400, detail="No wallets to import")
 
@@ -82,13 +82,12 @@ async def import_wallets_xlsx(
 
 @router.put("/", status_code=200, response_model=List[WalletSchema])
 async def put_wallets(
-    access_token: Annotated[str, Depends(get_access_token)],
-    token_service: Annotated[TokenService, Depends(token_service)],
+    user_data: Annotated[
+        Dict[str, Any], Security(current_user, scopes=["wallets:write"])
+    ],
     wallet_service: Annotated[WalletService, Depends(wallet_service)],
     wallets: List[WalletPutSchema],
 ) -> Sequence[Wallet]:
-    user_data = await token_service.check_access_token(access_token)
-
     if not wallets:
         raise HTTPException(status_code=400, detail="No wallets to put")
 
@@ -97,13 +96,12 @@ async def put_wallets(
 
 @router.patch("/", status_code=200, response_model=List[WalletSchema])
 async def patch_wallets(
-    access_token: Annotated[str, Depends(get_access_token)],
-    token_service: Annotated[TokenService, Depends(token_service)],
+    user_data: Annotated[
+        Dict[str, Any], Security(current_user, scopes=["wallets:write"])
+    ],
     wallet_service: Annotated[WalletService, Depends(wallet_service)],
     wallets: List[WalletPatchSchema],
 ) -> Sequence[Wallet]:
-    user_data = await token_service.check_access_token(access_token)
-
     if not wallets:
         raise HTTPException(status_code=400, detail="No wallets to patch")
 
@@ -112,13 +110,12 @@ async def patch_wallets(
 
 @router.delete("/", status_code=204)
 async def delete_wallets(
-    access_token: Annotated[str, Depends(get_access_token)],
-    token_service: Annotated[TokenService, Depends(token_service)],
+    user_data: Annotated[
+        Dict[str, Any], Security(current_user, scopes=["wallets:write"])
+    ],
     wallet_service: Annotated[WalletService, Depends(wallet_service)],
     wallet_ids: List[WalletDeleteSchema],
 ) -> None:
-    user_data = await token_service.check_access_token(access_token)
-
     if not wallet_ids:
         raise HTTPException(status_code=400, detail="No wallets to delete")
 
@@ -127,38 +124,72 @@ async def delete_wallets(
 
 @router.get("/groups/", status_code=200, response_model=List[WalletGroupSchema])
 async def get_user_wallet_groups(
-    access_token: Annotated[str, Depends(get_access_token)],
-    token_service: Annotated[TokenService, Depends(token_service)],
+    user_data: Annotated[
+        Dict[str, Any], Security(current_user, scopes=["wallets:read"])
+    ],
     wallet_group_service: Annotated[WalletGroupService, Depends(wallet_group_service)],
 ) -> Sequence[WalletGroup]:
-    user_data = await token_service.check_access_token(access_token)
-
     return await wallet_group_service.get_wallet_groups(user_data["id"])
 
 
+@router.get(
+    "/groups/summary/",
+    status_code=200,
+    response_model=List[WalletGroupSummarySchema],
+)
+async def get_user_wallet_group_summaries(
+    user_data: Annotated[
+        Dict[str, Any], Security(current_user, scopes=["wallets:read"])
+    ],
+    wallet_group_service: Annotated[WalletGroupService, Depends(wallet_group_service)],
+) -> List[WalletGroupSummarySchema]:
+    return await wallet_group_service.get_wallet_group_summaries(user_data["id"])
+
+
+@router.get(
+    "/groups/{wallet_group_id}/balance/",
+    status_code=200,
+    response_model=BalanceSummarySchema,
+)
+async def get_user_wallet_group_balance(
+    user_data: Annotated[
+        Dict[str, Any], Security(current_user, scopes=["wallets:read"])
+    ],
+    wallet_group_id: int,
+    selected_chains: List[ChainSchema],
+    balance_service: Annotated[BalanceService, Depends(balance_service)],
+    chain_registry: Annotated[ChainRegistry, Depends(chain_registry)],
+) -> BalanceSummarySchema:
+    for chain in selected_chains:
+        if chain.name not in chain_registry:
+            raise HTTPException(status_code=404, detail="Chain not found")
+
+    return await balance_service.get_balance_summary(
+        user_data["id"], selected_chains, wallet_group_id
+    )
+
+
 @router.get(
     "/groups/{wallet_group_id}/", status_code=200, response_model=WalletGroupSchema
 )
 async def get_user_wallet_group(
-    access_token: Annotated[str, Depends(get_access_token)],
-    token_service: Annotated[TokenService, Depends(token_service)],
+    user_data: Annotated[
+        Dict[str, Any], Security(current_user, scopes=["wallets:read"])
+    ],
     wallet_group_service: Annotated[WalletGroupService, Depends(wallet_group_service)],
     wallet_group_id: int,
 ) -> WalletGroup:
-    user_data = await token_service.check_access_token(access_token)
-
     return await wallet_group_service.get_wallet_group(wallet_group_id, user_data["id"])
 
 
 @router.post("/groups/", status_code=201, response_model=WalletGroupSchema)
 async def create_group(
-    access_token: Annotated[str, Depends(get_access_token)],
-    token_service: Annotated[TokenService, Depends(token_service)],
+    user_data: Annotated[
+        Dict[str, Any], Security(current_user, scopes=["wallets:write"])
+    ],
     wallet_group_service: Annotated[WalletGroupService, Depends(wallet_group_service)],
     wallet_group: WalletGroupCreateSchema,
 ) -> WalletGroup:
-    user_data = await token_service.check_access_token(access_token)
-
     return await wallet_group_service.create_wallet_group(wallet_group, user_data["id"])
 
 
@@ -166,14 +197,13 @@ async def create_group(
     "/groups{wallet_group_id}", status_code=200, response_model=WalletGroupSchema
 )
 async def put_group(
-    access_token: Annotated[str, Depends(get_access_token)],
-    token_service: Annotated[TokenService, Depends(token_service)],
+    user_data: Annotated[
+        Dict[str, Any], Security(current_user, scopes=["wallets:write"])
+    ],
     wallet_group_service: Annotated[WalletGroupService, Depends(wallet_group_service)],
     wallet_group_id: int,
     wallet_group: WalletGroupPutSchema,
 ) -> WalletGroup:
-    user_data = await token_service.check_access_token(access_token)
-
     return await wallet_group_service.update_wallet_group(
         wallet_group_id, wallet_group, user_data["id"]
     )
@@ -183,71 +213,91 @@ async def put_group(
     "/groups/{wallet_group_id}", status_code=200, response_model=WalletGroupSchema
 )
 async def patch_group(
-    access_token: Annotated[str, Depends(get_access_token)],
-    token_service: Annotated[TokenService, Depends(token_service)],
+    user_data: Annotated[
+        Dict[str, Any], Security(current_user, scopes=["wallets:write"])
+    ],
     wallet_group_service: Annotated[WalletGroupService, Depends(wallet_group_service)],
     wallet_group_id: int,
     wallet_group: WalletGroupPatchSchema,
 ) -> WalletGroup:
-    user_data = await token_service.check_access_token(access_token)
-
     return await wallet_group_service.update_wallet_group(
         wallet_group_id, wallet_group, user_data["id"]
     )
 
 
+@router.post("/groups/{wallet_group_id}/assign/", status_code=204)
+async def assign_wallets_to_group(
+    user_data: Annotated[
+        Dict[str, Any], Security(current_user, scopes=["wallets:write"])
+    ],
+    wallet_group_service: Annotated[WalletGroupService, Depends(wallet_group_service)],
+    wallet_group_id: int,
+    wallet_group_assign: WalletGroupAssignSchema,
+) -> None:
+    await wallet_group_service.assign_wallets(
+        wallet_group_id, wallet_group_assign.wallet_ids, user_data["id"]
+    )
+
+
 @router.delete("/groups/{wallet_group_id}/", status_code=204)
 async def delete_group(
-    access_token: Annotated[str, Depends(get_access_token)],
-    token_service: Annotated[TokenService, Depends(token_service)],
+    user_data: Annotated[
+        Dict[str, Any], Security(current_user, scopes=["wallets:write"])
+    ],
     wallet_group_service: Annotated[WalletGroupService, Depends(wallet_group_service)],
     wallet_group_id: int,
 ) -> None:
-    user_data = await token_service.check_access_token(access_token)
-
     await wallet_group_service.delete_wallet_group(wallet_group_id, user_data["id"])
 
 
 @router.get("/chains/", status_code=200, response_model=ChainsSchema)
 async def get_chains(
     access_token: Annotated[str, Depends(get_access_token)],
-    token_service: Annotated[TokenService, Depends(token_service)],
-) -> ChainsSchema:
-    # await token_service.check_access_token(access_token)
-
-    return ChainsSchema(
-        chains=[
-            ChainSchema(
-                name=chain, symbol=chain_info["currency"], logo=chain_info["chain_logo"]
-            )
-            for chain, chain_info in CHAINS.items()
-        ]
+    chain_registry: Annotated[ChainRegistry, Depends(chain_registry)],
+) -> Response:
+    return Response(
+        content=chain_registry.chains_response, media_type="application/json"
     )
 
 
 @router.get("/balance/", status_code=200, response_model=List[ChainBalanceSchema])
 async def get_wallet_balance(
-    access_token: Annotated[str, Depends(get_access_token)],
-    token_service: Annotated[TokenService, Depends(token_service)],
+    user_data: Annotated[
+        Dict[str, Any], Security(current_user, scopes=["wallets:read"])
+    ],
     selected_chains: List[ChainSchema],
     balance_service: Annotated[BalanceService, Depends(balance_service)],
+    chain_registry: Annotated[ChainRegistry, Depends(chain_registry)],
 ) -> List[ChainBalanceSchema]:
-    user_data = await token_service.check_access_token(access_token)
-
     for chain in selected_chains:
-        if chain.name not in CHAINS:
+        if chain.name not in chain_registry:
             raise HTTPException(status_code=404, detail="Chain not found")
 
     return await balance_service.get_wallets_balance(user_data["id"], selected_chains)
 
 
+@router.get("/balance/summary/", status_code=200, response_model=BalanceSummarySchema)
+async def get_wallet_balance_summary(
+    user_data: Annotated[
+        Dict[str, Any], Security(current_user, scopes=["wallets:read"])
+    ],
+    selected_chains: List[ChainSchema],
+    balance_service: Annotated[BalanceService, Depends(balance_service)],
+    chain_registry: Annotated[ChainRegistry, Depends(chain_registry)],
+) -> BalanceSummarySchema:
+    for chain in selected_chains:
+        if chain.name not in chain_registry:
+            raise HTTPException(status_code=404, detail="Chain not found")
+
+    return await balance_service.get_balance_summary(user_data["id"], selected_chains)
+
+
 @router.get("/{wallet_id}/", status_code=200, response_model=WalletSchema)
 async def get_wallet(
-    access_token: Annotated[str, Depends(get_access_token)],
-    token_service: Annotated[TokenService, Depends(token_service)],
+    user_data: Annotated[
+        Dict[str, Any], Security(current_user, scopes=["wallets:read"])
+    ],
     wallet_service: Annotated[WalletService, Depends(wallet_service)],
     wallet_id: int,
 ) -> Wallet:
-    user_data = await token_service.check_access_token(access_token)
-
     return await wallet_service.get_wallet(wallet_id, user_data["id"])
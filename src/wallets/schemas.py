@@ -1,9 +1,17 @@
-from decimal import Decimal
-import re
+from datetime import datetime
+from decimal import Decimal, localcontext
 from enum import Enum
 from typing import List
 
-from pydantic import BaseModel, Field, PositiveInt, validator
+from pydantic import (
+    AliasChoices,
+    BaseModel,
+    Field,
+    PositiveInt,
+    computed_field,
+    validator,
+)
+from wallets.utils import format_units, validate_address
 
 
 class Color(str, Enum):
@@ -15,22 +23,17 @@ class Color(str, Enum):
 class WalletSchema(BaseModel):
     id: int
     number: int = Field(examples=["1"])
-    address: str = Field(examples=["0x1234567890123456789012345678901234567890"])
+    address: str = Field(
+        examples=["0x1234567890123456789012345678901234567890"],
+        validation_alias=AliasChoices("checksum_address", "address"),
+    )
     group_id: int | None = Field(examples=[1], default=None)
 
 
 class WalletCreateSchema(BaseModel):
+    # Validated in bulk by the importer, see wallets.utils.validate_addresses
     address: str = Field(examples=["0x1234567890123456789012345678901234567890"])
 
-    @validator("address")
-    def validate_address(cls, address: str) -> str:
-        address_pattern = re.compile(r"^0x[a-fA-F0-9]{40}$")
-
-        if not address_pattern.match(address):
-            raise ValueError("Invalid wallet address format")
-
-        return address
-
 
 class WalletPutSchema(BaseModel):
     id: PositiveInt
@@ -38,6 +41,8 @@ class WalletPutSchema(BaseModel):
     address: str = Field(examples=["0x1234567890123456789012345678901234567890"])
     group_id: PositiveInt | None = Field(examples=[1])
 
+    _validate_address = validator("address", allow_reuse=True)(validate_address)
+
 
 class WalletPatchSchema(BaseModel):
     id: PositiveInt
@@ -47,6 +52,10 @@ class WalletPatchSchema(BaseModel):
     )
     group_id: PositiveInt | None = Field(examples=[1], default=None)
 
+    @validator("address")
+    def validate_optional_address(cls, address: str | None) -> str | None:
+        return address if address is None else validate_address(address)
+
 
 class WalletDeleteSchema(BaseModel):
     id: PositiveInt
@@ -74,6 +83,10 @@ class WalletGroupPatchSchema(BaseModel):
     color: Color | None = Field(examples=["red"], default=None)
 
 
+class WalletGroupAssignSchema(BaseModel):
+    wallet_ids: List[PositiveInt] = Field(examples=[[1, 2, 3]], min_length=1)
+
+
 class ChainSchema(BaseModel):
     name: str = Field(examples=["Ethereum"])
     symbol: str = Field(examples=["ETH"])
@@ -86,12 +99,91 @@ class ChainsSchema(BaseModel):
 
 class WalletBalanceSchema(BaseModel):
     address: str = Field(examples=["0x1234567890123456789012345678901234567890"])
-    native_balance: int | float = Field(examples=[5])
-    native_in_usd: int | float = Field(examples=[1000])
-    usdt_balance: int | float | None = Field(examples=[50.167])
-    usdc_balance: int | float | None = Field(examples=[0.000902])
+    # Amounts are carried in base units and only scaled when serialized
+    native_balance_raw: int = Field(exclude=True)
+    native_decimals: int = Field(exclude=True)
+    native_usd_price: Decimal = Field(exclude=True)
+    usdt_balance_raw: int | None = Field(exclude=True, default=None)
+    usdt_decimals: int | None = Field(exclude=True, default=None)
+    usdc_balance_raw: int | None = Field(exclude=True, default=None)
+    usdc_decimals: int | None = Field(exclude=True, default=None)
+
+    @computed_field(examples=["5"])
+    @property
+    def native_balance(self) -> str:
+        return format_units(self.native_balance_raw, self.native_decimals)
+
+    @computed_field(examples=["1000.25"])
+    @property
+    def native_in_usd(self) -> str:
+        native_balance_raw = Decimal(self.native_balance_raw)
+        # A product never has more digits than both factors together, so this
+        # precision keeps the result exact where the default 28 digits would round
+        precision = len(native_balance_raw.as_tuple().digits) + len(
+            self.native_usd_price.as_tuple().digits
+        )
+
+        with localcontext(prec=precision):
+            native_balance = native_balance_raw.scaleb(-self.native_decimals)
+
+            return f"{(native_balance * self.native_usd_price).normalize():f}"
+
+    @computed_field(examples=["50.167"])
+    @property
+    def usdt_balance(self) -> str | None:
+        if self.usdt_balance_raw is None or self.usdt_decimals is None:
+            return None
+
+        return format_units(self.usdt_balance_raw, self.usdt_decimals)
+
+    @computed_field(examples=["0.000902"])
+    @property
+    def usdc_balance(self) -> str | None:
+        if self.usdc_balance_raw is None or self.usdc_decimals is None:
+            return None
+
+        return format_units(self.usdc_balance_raw, self.usdc_decimals)
 
 
 class ChainBalanceSchema(BaseModel):
     chain: str
     balance: WalletBalanceSchema
+
+
+class BalanceTotalsSchema(BaseModel):
+    native_in_usd: float = Field(examples=[1000.25])
+    usdt_balance: float = Field(examples=[50.167])
+    usdc_balance: float = Field(examples=[0.000902])
+    total_in_usd: float = Field(examples=[1050.417902])
+
+
+class WalletBalanceTotalsSchema(BalanceTotalsSchema):
+    wallet_id: int
+    address: str = Field(examples=["0x1234567890123456789012345678901234567890"])
+
+
+class ChainBalanceTotalsSchema(BalanceTotalsSchema):
+    chain: str = Field(examples=["Ethereum"])
+
+
+class WalletGroupBalanceTotalsSchema(BalanceTotalsSchema):
+    group_id: int | None = Field(examples=[1])
+
+
+class BalanceSummarySchema(BaseModel):
+    balances: List[ChainBalanceSchema]
+    wallets: List[WalletBalanceTotalsSchema]
+    chains: List[ChainBalanceTotalsSchema]
+    groups: List[WalletGroupBalanceTotalsSchema]
+    total: BalanceTotalsSchema
+
+
+class CachedBalanceTotalsSchema(BalanceTotalsSchema):
+    chains: List[str] = Field(examples=[["Ethereum", "BSC"]])
+    computed_at: datetime
+
+
+class WalletGroupSummarySchema(WalletGroupSchema):
+    wallet_count: int = Field(examples=[3])
+    # Totals from the user's latest balance summary, if still cached
+    balance: CachedBalanceTotalsSchema | None = None
@@ -1,57 +1,76 @@
 import asyncio
-from typing import Any, Dict, List, Sequence, Type
+import functools
+import json
+from decimal import Decimal
+from typing import Any, BinaryIO, Dict, List, Sequence, Set, Tuple, Type
 
 import aiohttp
-from database import async_session
-from eth_typing import Address, ChecksumAddress
+import numpy as np
+from database import async_session, replica_session
+from eth_typing import ChecksumAddress
 from fastapi import HTTPException, UploadFile
 from openpyxl import load_workbook
+from sqlalchemy import Row
 from unit_of_work import UnitOfWork
-from wallets.config import ABI, CHAINS
+from wallets.aggregation import balance_amounts, sum_by, totals_to_dicts
+from wallets.cache import BalanceTotalsCache, CachedTotals
+from wallets.chains import Chain, ChainRegistry
+from wallets.erc20 import decode_uint256, encode_balance_of, encode_decimals
 from wallets.models import Wallet, WalletGroup
 from wallets.schemas import (
+    BalanceSummarySchema,
+    BalanceTotalsSchema,
+    CachedBalanceTotalsSchema,
     ChainBalanceSchema,
+    ChainBalanceTotalsSchema,
     ChainSchema,
     WalletBalanceSchema,
+    WalletBalanceTotalsSchema,
     WalletCreateSchema,
     WalletDeleteSchema,
+    WalletGroupBalanceTotalsSchema,
     WalletGroupCreateSchema,
     WalletGroupPatchSchema,
     WalletGroupPutSchema,
+    WalletGroupSummarySchema,
     WalletPatchSchema,
     WalletPutSchema,
 )
-from web3 import AsyncHTTPProvider, AsyncWeb3
+from wallets.utils import (
+    BATCH_VALIDATION_THREAD_THRESHOLD,
+    ValidAddress,
+    address_columns,
+    validate_addresses,
+)
+from web3 import AsyncWeb3
 
 
 class WalletService:
-    def __init__(self, unit_of_work: Type[UnitOfWork]):
-        self._unit_of_work = unit_of_work(async_session)
+    def __init__(
+        self, unit_of_work: Type[UnitOfWork], totals_cache: BalanceTotalsCache
+    ):
+        self._unit_of_work = unit_of_work
+        self._totals_cache = totals_cache
 
     async def get_wallets(self, user_id: int) -> Sequence[Wallet]:
-        async with self._unit_of_work as uow:
+        async with self._unit_of_work(replica_session, read_only=True) as uow:
             wallets = await uow.wallet.get_multiple_by(user_id=user_id)
 
             return wallets
 
     async def get_wallet(self, wallet_id: int, user_id: int) -> Wallet:
-        async with self._unit_of_work as uow:
-            wallet = await uow.wallet.get_by(id=wallet_id)
+        async with self._unit_of_work(replica_session, read_only=True) as uow:
+            wallet = await uow.wallet.get_by(id=wallet_id, user_id=user_id)
 
             if not wallet:
                 raise HTTPException(status_code=404, detail="Wallet not found")
 
-            if wallet.user_id != user_id:
-                raise HTTPException(
-                    status_code=403, detail="Wallet belongs to another user"
-                )
-
             return wallet
 
     async def update_wallets(
         self, wallets: List[WalletPatchSchema] | List[WalletPutSchema], user_id: int
     ) -> Sequence[Wallet]:
-        async with self._unit_of_work as uow:
+        async with self._unit_of_work(async_session) as uow:
             wallet_ids: List[int] = [wallet.id for wallet in wallets]
 
             wallets_to_update = await self._get_and_validate_wallets(
@@ -61,11 +80,21 @@ class WalletService:
             wallet_mappings = [
                 wallet.model_dump(exclude_none=True) for wallet in wallets
             ]
+            for wallet_mapping in wallet_mappings:
+                if "address" in wallet_mapping:
+                    wallet_mapping.update(address_columns(wallet_mapping["address"]))
 
             updated_wallets = await uow.wallet.update_multiple_wallets(
                 wallets_to_update, wallet_mappings
             )
 
+            # Keep the per-user sequence ahead of manually assigned numbers
+            numbers = [wallet.number for wallet in wallets if wallet.number is not None]
+            if numbers:
+                await uow.user.advance_wallet_number(user_id, max(numbers))
+
+            uow.on_commit(lambda: self._totals_cache.invalidate(user_id))
+
             await uow.commit()
 
             return updated_wallets
@@ -73,137 +102,226 @@ class WalletService:
     async def delete_wallets(
         self, wallet_ids: List[WalletDeleteSchema], user_id: int
     ) -> None:
-        async with self._unit_of_work as uow:
-            wallet_ids_to_delete = [wallet.id for wallet in wallet_ids]
+        async with self._unit_of_work(async_session) as uow:
+            wallet_ids_to_delete = {wallet.id for wallet in wallet_ids}
 
-            await self._get_and_validate_wallets(uow, wallet_ids_to_delete, user_id)
+            deleted = await uow.wallet.delete_multiple_wallets(
+                list(wallet_ids_to_delete), user_id
+            )
 
-            await uow.wallet.delete_multiple_wallets(wallet_ids_to_delete, user_id)
+            if deleted != len(wallet_ids_to_delete):
+                raise HTTPException(status_code=400, detail="Invalid wallet IDs")
+
+            uow.on_commit(lambda: self._totals_cache.invalidate(user_id))
 
             await uow.commit()
 
     async def _get_and_validate_wallets(
         self, uow: UnitOfWork, wallet_ids: List[int], user_id: int
     ) -> Sequence[Wallet]:
-        wallets = await uow.wallet.filter_by_wallet_ids(wallet_ids)
+        wallets = await uow.wallet.filter_by_wallet_ids(wallet_ids, user_id)
 
         if len(wallets) != len(wallet_ids):
             raise HTTPException(status_code=400, detail="Invalid wallet IDs")
 
-        for wallet in wallets:
-            if wallet.user_id != user_id:
-                raise HTTPException(
-                    status_code=403,
-                    detail="Some of the wallets belongs to another user",
-                )
-
         return wallets
 
 
 class WalletImporterService:
-    def __init__(self, unit_of_work: Type[UnitOfWork]) -> None:
-        self._unit_of_work = unit_of_work(async_session)
+    def __init__(
+        self, unit_of_work: Type[UnitOfWork], totals_cache: BalanceTotalsCache
+    ) -> None:
+        self._unit_of_work = unit_of_work
+        self._totals_cache = totals_cache
 
     async def import_wallets(
         self, wallets: List[WalletCreateSchema], user_id: int
     ) -> Sequence[Wallet]:
-        async with self._unit_of_work as uow:
-            existing_wallets = await uow.wallet.get_multiple_by(user_id=user_id)
-            existing_addresses = {wallet.address for wallet in existing_wallets}
-            max_numbered_wallet = self._get_max_numbered_wallet(existing_wallets)
-
-            wallets_data: List[Dict[str, Any]] = []
-            for wallet in wallets:
-                if wallet.address in existing_addresses:
-                    continue
+        addresses = await self._validate_addresses(
+            list(enumerate((wallet.address for wallet in wallets), start=1))
+        )
 
-                max_numbered_wallet += 1
-                wallet_data = {
-                    "number": max_numbered_wallet,
-                    "address": wallet.address,
-                    "user_id": user_id,
-                }
-                wallets_data.append(wallet_data)
-
-            imported_wallets = await uow.wallet.create_multiple(wallets_data)
-
-            await uow.commit()
-
-            return imported_wallets
+        return await self._import_addresses(addresses, user_id)
 
     async def import_wallets_xlsx(
         self, wallets_xlsx: UploadFile, user_id: int
     ) -> Sequence[Wallet]:
-        async with self._unit_of_work as uow:
-            wb = load_workbook(filename=wallets_xlsx.file)
-            sheet = wb.active
+        raw_addresses = await asyncio.to_thread(
+            self._read_xlsx_addresses, wallets_xlsx.file
+        )
+        addresses = await self._validate_addresses(raw_addresses)
 
-            existing_wallets = await uow.wallet.get_multiple_by(user_id=user_id)
-            existing_addresses = {wallet.address for wallet in existing_wallets}
-            max_numbered_wallet = self._get_max_numbered_wallet(existing_wallets)
+        return await self._import_addresses(addresses, user_id)
 
-            wallets_data: List[Dict[str, Any]] = []
+    async def _import_addresses(
+        self, addresses: List[ValidAddress], user_id: int
+    ) -> Sequence[Wallet]:
+        async with self._unit_of_work(async_session) as uow:
+            # Taken before reading existing addresses, so a concurrent import of
+            # the same addresses waits and then sees the wallets this one adds
+            await uow.user.lock_wallet_numbers(user_id)
 
-            for row in sheet.iter_rows(min_rows=1):
-                if row[0].value in existing_addresses:
-                    continue
+            existing_addresses = await self._get_existing_addresses(uow, user_id)
 
-                max_numbered_wallet += 1
-                wallet_data = {
-                    "number": max_numbered_wallet,
-                    "address": row[0].value,
-                    "user_id": user_id,
-                }
-                wallets_data.append(wallet_data)
+            new_addresses = self._filter_new_addresses(addresses, existing_addresses)
 
-            imported_wallets = await uow.wallet.create_multiple(wallets_data)
+            imported_wallets = await self._create_numbered_wallets(
+                uow, new_addresses, user_id
+            )
+
+            uow.on_commit(lambda: self._totals_cache.invalidate(user_id))
 
             await uow.commit()
 
             return imported_wallets
 
-    def _get_max_numbered_wallet(self, existing_wallets: Sequence[Wallet]) -> int:
-        numbered_wallets = [wallet.number for wallet in existing_wallets]
+    def _read_xlsx_addresses(self, wallets_xlsx: BinaryIO) -> List[Tuple[int, Any]]:
+        """The first cell of every non-blank row, with its sheet row number."""
+        wb = load_workbook(filename=wallets_xlsx, read_only=True)
+        sheet = wb.active
+
+        addresses = [
+            (row_number, row[0])
+            for row_number, row in enumerate(sheet.iter_rows(values_only=True), start=1)
+            if row and row[0] is not None
+        ]
+        wb.close()
+
+        # A first cell that is not even 0x-prefixed is a column header
+        if addresses and not str(addresses[0][1]).lower().startswith("0x"):
+            del addresses[0]
+
+        return addresses
+
+    async def _validate_addresses(
+        self, raw_addresses: List[Tuple[int, Any]]
+    ) -> List[ValidAddress]:
+        if len(raw_addresses) >= BATCH_VALIDATION_THREAD_THRESHOLD:
+            addresses, errors = await asyncio.to_thread(
+                validate_addresses, raw_addresses
+            )
+        else:
+            addresses, errors = validate_addresses(raw_addresses)
 
-        return max(numbered_wallets, default=0)
+        if errors:
+            raise HTTPException(
+                status_code=422, detail=[error._asdict() for error in errors]
+            )
+
+        return addresses
+
+    async def _create_numbered_wallets(
+        self, uow: UnitOfWork, addresses: List[ValidAddress], user_id: int
+    ) -> Sequence[Wallet]:
+        if not addresses:
+            return []
+
+        first_number = await uow.user.reserve_wallet_numbers(user_id, len(addresses))
+
+        wallets_data: List[Dict[str, Any]] = [
+            {
+                "number": number,
+                "address": address.address,
+                "checksum_address": address.checksum_address,
+                "user_id": user_id,
+            }
+            for number, address in enumerate(addresses, start=first_number)
+        ]
+
+        return await uow.wallet.create_multiple(wallets_data)
+
+    async def _get_existing_addresses(
+        self, uow: UnitOfWork, user_id: int
+    ) -> Set[bytes]:
+        rows = await uow.wallet.get_columns(Wallet.address, user_id=user_id)
+
+        return {row.address for row in rows}
+
+    def _filter_new_addresses(
+        self, addresses: List[ValidAddress], existing_addresses: Set[bytes]
+    ) -> List[ValidAddress]:
+        new_addresses: List[ValidAddress] = []
+        seen_addresses = set(existing_addresses)
+
+        for address in addresses:
+            if address.address in seen_addresses:
+                continue
+
+            seen_addresses.add(address.address)
+            new_addresses.append(address)
+
+        return new_addresses
 
 
 class WalletGroupService:
-    def __init__(self, unit_of_work: Type[UnitOfWork]) -> None:
-        self._unit_of_work = unit_of_work(async_session)
+    def __init__(
+        self, unit_of_work: Type[UnitOfWork], totals_cache: BalanceTotalsCache
+    ) -> None:
+        self._unit_of_work = unit_of_work
+        self._totals_cache = totals_cache
 
     async def get_wallet_groups(self, user_id: int) -> Sequence[WalletGroup]:
-        async with self._unit_of_work as uow:
+        async with self._unit_of_work(replica_session, read_only=True) as uow:
             return await uow.wallet_group.get_multiple_by(user_id=user_id)
 
+    async def get_wallet_group_summaries(
+        self, user_id: int
+    ) -> List[WalletGroupSummarySchema]:
+        async with self._unit_of_work(replica_session, read_only=True) as uow:
+            summaries = await uow.wallet_group.get_summaries(user_id)
+
+        group_totals = self._totals_cache.get(user_id)
+
+        return [
+            WalletGroupSummarySchema(
+                id=summary.id,
+                name=summary.name,
+                color=summary.color,
+                wallet_count=summary.wallet_count,
+                balance=self._cached_balance(group_totals.get(summary.id)),
+            )
+            for summary in summaries
+        ]
+
+    def _cached_balance(
+        self, cached: CachedTotals | None
+    ) -> CachedBalanceTotalsSchema | None:
+        if cached is None:
+            return None
+
+        return CachedBalanceTotalsSchema(
+            chains=sorted(cached.chains),
+            computed_at=cached.computed_at,
+            **cached.totals,
+        )
+
     async def get_wallet_group(self, wallet_group_id: int, user_id: int) -> WalletGroup:
-        async with self._unit_of_work as uow:
-            wallet_group = await uow.wallet_group.get_by(id=wallet_group_id)
+        async with self._unit_of_work(replica_session, read_only=True) as uow:
+            wallet_group = await uow.wallet_group.get_by(
+                id=wallet_group_id, user_id=user_id
+            )
 
             if not wallet_group:
                 raise HTTPException(status_code=404, detail="Wallet group not found")
 
-            if wallet_group.user_id != user_id:
-                raise HTTPException(
-                    status_code=403, detail="Wallet group belongs to another user"
-                )
-
             return wallet_group
 
     async def create_wallet_group(
         self, wallet_group: WalletGroupCreateSchema, user_id: int
     ) -> WalletGroup:
-        async with self._unit_of_work as uow:
+        async with self._unit_of_work(async_session) as uow:
             wallet_group_data = wallet_group.model_dump(exclude_none=True)
             wallet_group_data["user_id"] = user_id
 
-            if await uow.wallet_group.get_by(name=wallet_group_data["name"]):
+            created_wallet_group = await uow.wallet_group.create_if_not_exists(
+                wallet_group_data
+            )
+
+            if not created_wallet_group:
                 raise HTTPException(
                     status_code=409, detail="Wallet group with this name already exists"
                 )
 
-            created_wallet_group = await uow.wallet_group.create(wallet_group_data)
-
             await uow.commit()
 
             return created_wallet_group
@@ -214,17 +332,14 @@ class WalletGroupService:
         wallet_group: WalletGroupPatchSchema | WalletGroupPutSchema,
         user_id: int,
     ) -> WalletGroup:
-        async with self._unit_of_work as uow:
-            wallet_group_to_update = await uow.wallet_group.get_by(id=wallet_group_id)
+        async with self._unit_of_work(async_session) as uow:
+            wallet_group_to_update = await uow.wallet_group.get_by(
+                id=wallet_group_id, user_id=user_id
+            )
 
             if not wallet_group_to_update:
                 raise HTTPException(status_code=404, detail="Wallet group not found")
 
-            if wallet_group_to_update.user_id != user_id:
-                raise HTTPException(
-                    status_code=403, detail="You can only update your wallet groups"
-                )
-
             wallet_group_data = wallet_group.model_dump(exclude_none=True)
 
             updated_wallet_group = await uow.wallet_group.update(
@@ -235,110 +350,241 @@ class WalletGroupService:
 
             return updated_wallet_group
 
-    async def delete_wallet_group(self, wallet_group_id: int, user_id: int) -> None:
-        async with self._unit_of_work as uow:
-            wallet_group_to_delete = await uow.wallet_group.get_by(id=wallet_group_id)
+    async def assign_wallets(
+        self, wallet_group_id: int, wallet_ids: List[int], user_id: int
+    ) -> None:
+        async with self._unit_of_work(async_session) as uow:
+            wallet_ids_to_assign = set(wallet_ids)
 
-            if not wallet_group_to_delete:
-                raise HTTPException(status_code=404, detail="Wallet group not found")
+            assigned = await uow.wallet.assign_group(
+                list(wallet_ids_to_assign), wallet_group_id, user_id
+            )
 
-            if wallet_group_to_delete.user_id != user_id:
+            # Nothing matches when the group isn't the user's, and fewer rows
+            # match when some wallets aren't; either way the update is undone
+            if assigned != len(wallet_ids_to_assign):
                 raise HTTPException(
-                    status_code=403, detail="You can only delete your wallet groups"
+                    status_code=404, detail="Wallet group or wallets not found"
                 )
 
+            uow.on_commit(lambda: self._totals_cache.invalidate(user_id))
+
+            await uow.commit()
+
+    async def delete_wallet_group(self, wallet_group_id: int, user_id: int) -> None:
+        async with self._unit_of_work(async_session) as uow:
+            wallet_group_to_delete = await uow.wallet_group.get_by(
+                id=wallet_group_id, user_id=user_id
+            )
+
+            if not wallet_group_to_delete:
+                raise HTTPException(status_code=404, detail="Wallet group not found")
+
             await uow.wallet_group.delete(wallet_group_to_delete)
 
+            uow.on_commit(lambda: self._totals_cache.invalidate(user_id))
+
             await uow.commit()
 
 
 class BalanceService:
-    def __init__(self, unit_of_work: Type[UnitOfWork]) -> None:
-        self._unit_of_work = unit_of_work(async_session)
+    def __init__(
+        self,
+        unit_of_work: Type[UnitOfWork],
+        chain_registry: ChainRegistry,
+        totals_cache: BalanceTotalsCache,
+    ) -> None:
+        self._unit_of_work = unit_of_work
+        self._chain_registry = chain_registry
+        self._totals_cache = totals_cache
+        self._decimals: Dict[Tuple[str, ChecksumAddress], int] = {}
 
     async def get_wallets_balance(
         self, user_id: int, selected_chains: List[ChainSchema]
     ) -> List[ChainBalanceSchema]:
-        tasks = list()
-        async with self._unit_of_work as uow:
-            wallets = await uow.wallet.get_multiple_by(user_id=user_id)
-
-            for wallet in wallets:
-                wallet_address = wallet.address
+        chains = self._resolve_chains(selected_chains)
 
-                for selected_chain in selected_chains:
-                    chain = selected_chain.name
-                    chain_info = CHAINS[selected_chain.name]
-                    tasks.append(self._process_chain(wallet_address, chain, chain_info))
+        _, cells = await self._get_balance_cells(user_id, chains)
 
-            results = await asyncio.gather(*tasks)
+        return [balance for _, _, balance in cells]
 
-            wallet_balances = [
-                ChainBalanceSchema(**result) for result in results if result
-            ]
-
-            return wallet_balances
-
-    async def _process_chain(
-        self, wallet_address: str, chain: str, chain_info
-    ) -> dict[str, Any] | None:
-        for rpc in chain_info["rpc"]:
-            try:
-                web3 = AsyncWeb3(AsyncHTTPProvider(rpc))
+    async def get_balance_summary(
+        self,
+        user_id: int,
+        selected_chains: List[ChainSchema],
+        wallet_group_id: int | None = None,
+    ) -> BalanceSummarySchema:
+        """
+        Balances and totals for all of the user's wallets, or only for the
+        wallets of one group if wallet_group_id is given.
+        """
+        chains = self._resolve_chains(selected_chains)
+
+        wallets, cells = await self._get_balance_cells(user_id, chains, wallet_group_id)
+
+        balances = [balance for _, _, balance in cells]
+        wallet_index = np.fromiter(
+            (wallet_index for wallet_index, _, _ in cells),
+            dtype=np.intp,
+            count=len(cells),
+        )
+        chain_index = np.fromiter(
+            (chain_index for _, chain_index, _ in cells),
+            dtype=np.intp,
+            count=len(cells),
+        )
+        # Ungrouped wallets share key 0, group ids are positive
+        group_ids, wallet_group_index = np.unique(
+            np.array([wallet.group_id or 0 for wallet in wallets], dtype=np.int64),
+            return_inverse=True,
+        )
+
+        amounts = balance_amounts([balance.balance for balance in balances])
+
+        wallet_totals = sum_by(wallet_index, amounts, len(wallets))
+        chain_totals = sum_by(chain_index, amounts, len(chains))
+        group_totals = sum_by(wallet_group_index[wallet_index], amounts, len(group_ids))
+        user_totals = sum_by(np.zeros(len(cells), dtype=np.intp), amounts, 1)
+
+        group_totals_by_id = {
+            group_id or None: totals
+            for group_id, totals in zip(
+                group_ids.tolist(), totals_to_dicts(group_totals)
+            )
+        }
+        chain_names = frozenset(chain.name for chain in chains)
+        if wallet_group_id is None:
+            self._totals_cache.set(user_id, chain_names, group_totals_by_id)
+        elif wallet_group_id in group_totals_by_id:
+            self._totals_cache.update(
+                user_id,
+                chain_names,
+                wallet_group_id,
+                group_totals_by_id[wallet_group_id],
+            )
 
-                wallet_address = web3.to_checksum_address(wallet_address)
+        return BalanceSummarySchema(
+            balances=balances,
+            wallets=[
+                WalletBalanceTotalsSchema(
+                    wallet_id=wallet.id, address=wallet.checksum_address, **totals
+                )
+                for wallet, totals in zip(wallets, totals_to_dicts(wallet_totals))
+            ],
+            chains=[
+                ChainBalanceTotalsSchema(chain=chain.name, **totals)
+                for chain, totals in zip(chains, totals_to_dicts(chain_totals))
+            ],
+            groups=[
+                WalletGroupBalanceTotalsSchema(group_id=group_id, **totals)
+                for group_id, totals in group_totals_by_id.items()
+            ],
+            total=BalanceTotalsSchema(**totals_to_dicts(user_totals)[0]),
+        )
+
+    def _resolve_chains(self, selected_chains: List[ChainSchema]) -> List[Chain]:
+        return [
+            chain
+            for selected_chain in selected_chains
+            if (chain := self._chain_registry.get(selected_chain.name)) is not None
+        ]
+
+    async def _get_balance_cells(
+        self, user_id: int, chains: List[Chain], wallet_group_id: int | None = None
+    ) -> Tuple[Sequence[Row], List[Tuple[int, int, ChainBalanceSchema]]]:
+        """
+        Returns the user's wallets and one balance per wallet and chain with
+        activity, tagged with the wallet and chain positions.
+        """
+        filters: Dict[str, Any] = {"user_id": user_id}
+
+        async with self._unit_of_work(replica_session, read_only=True) as uow:
+            if wallet_group_id is not None:
+                if not await uow.wallet_group.exists(
+                    id=wallet_group_id, user_id=user_id
+                ):
+                    raise HTTPException(
+                        status_code=404, detail="Wallet group not found"
+                    )
 
-                if await web3.eth.get_transaction_count(wallet_address) == 0:
-                    return
+                filters["group_id"] = wallet_group_id
 
-                native_balance = await self._get_native_balance(web3, wallet_address)
+            wallets = await uow.wallet.get_columns(
+                Wallet.id, Wallet.checksum_address, Wallet.group_id, **filters
+            )
 
-                native_in_usd = await self._native_balance_in_usd(
-                    chain_info["currency"], native_balance
+        # The RPC fan-out runs after the session is released
+        positions = [
+            (wallet_index, chain_index)
+            for wallet_index in range(len(wallets))
+            for chain_index in range(len(chains))
+        ]
+        results = await asyncio.gather(
+            *(
+                self._process_chain(
+                    wallets[wallet_index].checksum_address, chains[chain_index]
                 )
+                for wallet_index, chain_index in positions
+            )
+        )
 
-                usdt_balance = None
-                if "usdt_contract_address" in chain_info:
-                    usdt_contract_address = chain_info["usdt_contract_address"]
-                    usdt_balance = await self._get_contract_balance(
-                        web3, wallet_address, usdt_contract_address
-                    )
+        cells = [
+            (wallet_index, chain_index, ChainBalanceSchema(**result))
+            for (wallet_index, chain_index), result in zip(positions, results)
+            if result
+        ]
 
-                usdc_balance = None
-                if "usdc_contract_address" in chain_info:
-                    usdc_contract_address = chain_info["usdc_contract_address"]
-                    usdc_balance = await self._get_contract_balance(
-                        web3, wallet_address, usdc_contract_address
+        return wallets, cells
+
+    async def _process_chain(
+        self, wallet_address: ChecksumAddress, chain: Chain
+    ) -> dict[str, Any] | None:
+        async with chain.semaphore:
+            for rpc_endpoint in chain.rpc_endpoints:
+                try:
+                    return await self._get_chain_balance(
+                        rpc_endpoint.web3, wallet_address, chain
                     )
+                except aiohttp.ClientResponseError:
+                    continue
 
-                return {
-                    "chain": chain,
-                    "balance": WalletBalanceSchema(
-                        address=wallet_address,
-                        native_balance=native_balance,
-                        native_in_usd=native_in_usd,
-                        usdt_balance=usdt_balance,
-                        usdc_balance=usdc_balance,
-                    ),
-                }
+    async def _get_chain_balance(
+        self, web3: AsyncWeb3, wallet_address: ChecksumAddress, chain: Chain
+    ) -> dict[str, Any] | None:
+        if await web3.eth.get_transaction_count(wallet_address) == 0:
+            return
 
-            except aiohttp.ClientResponseError:
-                continue
+        native_balance = await web3.eth.get_balance(wallet_address)
 
-    async def _get_native_balance(
-        self, web3: AsyncWeb3, wallet_address: ChecksumAddress
-    ) -> int | float:
-        native_balance_wei = await web3.eth.get_balance(wallet_address)
-        native_balance = web3.from_wei(native_balance_wei, "ether")
+        native_usd_price = await self._get_usd_price(chain.currency)
 
-        if isinstance(native_balance, int):
-            return native_balance
+        usdt_balance, usdt_decimals = None, None
+        if chain.usdt is not None:
+            usdt_balance, usdt_decimals = await self._get_contract_balance(
+                web3, chain.name, wallet_address, chain.usdt.address
+            )
 
-        return float(f"{native_balance:.6f}")
+        usdc_balance, usdc_decimals = None, None
+        if chain.usdc is not None:
+            usdc_balance, usdc_decimals = await self._get_contract_balance(
+                web3, chain.name, wallet_address, chain.usdc.address
+            )
 
-    async def _native_balance_in_usd(
-        self, currency: str, native_balance: int | float
-    ) -> int | float:
+        return {
+            "chain": chain.name,
+            "balance": WalletBalanceSchema(
+                address=wallet_address,
+                native_balance_raw=native_balance,
+                native_decimals=chain.native_decimals,
+                native_usd_price=native_usd_price,
+                usdt_balance_raw=usdt_balance,
+                usdt_decimals=usdt_decimals,
+                usdc_balance_raw=usdc_balance,
+                usdc_decimals=usdc_decimals,
+            ),
+        }
+
+    async def _get_usd_price(self, currency: str) -> Decimal:
         async with aiohttp.ClientSession() as session:
             async with session.get(
                 f"https://min-api.cryptocompare.com/data/price?fsym={currency}&tsyms=USD"
@@ -348,26 +594,34 @@ class BalanceService:
                         status_code=500, detail="Failed to get USD price"
                     )
 
-                usd_price = (await resp.json())["USD"]
+                # Parse the price straight into a Decimal so it is never a float
+                prices = await resp.json(
+                    loads=functools.partial(json.loads, parse_float=Decimal)
+                )
 
-                return float(f"{native_balance * usd_price:.6f}")
+                return Decimal(prices["USD"])
 
     async def _get_contract_balance(
         self,
         web3: AsyncWeb3,
+        chain: str,
         wallet_address: ChecksumAddress,
-        usdt_contract_address: Address,
-    ) -> int | float:
-        usdt_contract = web3.eth.contract(address=usdt_contract_address, abi=ABI)
-
-        contract_balance = await usdt_contract.functions.balanceOf(
-            wallet_address
-        ).call()
-        decimals = await usdt_contract.functions.decimals().call()
-
-        contract_balance = contract_balance / 10**decimals
+        contract: ChecksumAddress,
+    ) -> Tuple[int, int]:
+        contract_balance = decode_uint256(
+            await web3.eth.call(
+                {
+                    "to": contract,
+                    "data": encode_balance_of(bytes.fromhex(wallet_address[2:])),
+                }
+            )
+        )
 
-        if contract_balance.is_integer():
-            return int(contract_balance)
+        decimals = self._decimals.get((chain, contract))
+        if decimals is None:
+            decimals = decode_uint256(
+                await web3.eth.call({"to": contract, "data": encode_decimals()})
+            )
+            self._decimals[(chain, contract)] = decimals
 
-        return float(f"{contract_balance:.6f}")
+        return contract_balance, decimals
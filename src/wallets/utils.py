@@ -0,0 +1,137 @@
+import re
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, NamedTuple, Tuple
+
+from configs.config import settings
+from eth_hash.auto import keccak
+from eth_typing import ChecksumAddress
+
+ADDRESS_PATTERN = re.compile(r"^0x[a-fA-F0-9]{40}$")
+
+# Imports at least this large are validated in a worker thread
+BATCH_VALIDATION_THREAD_THRESHOLD = 1000
+
+
+class AddressError(NamedTuple):
+    row: int
+    address: str | None
+    error: str
+
+
+class ValidAddress(NamedTuple):
+    address: bytes
+    checksum_address: ChecksumAddress
+
+
+@lru_cache(maxsize=settings.wallets.CHECKSUM_CACHE_SIZE)
+def _checksum_address(address_hex: str) -> ChecksumAddress:
+    # EIP-55 without the input normalisation done by eth_utils.to_checksum_address,
+    # address_hex must already be 40 lowercase hex characters
+    digest = keccak(address_hex.encode()).hex()
+
+    return ChecksumAddress(
+        "0x"
+        + "".join(
+            [
+                char.upper() if nibble > "7" else char
+                for char, nibble in zip(address_hex, digest)
+            ]
+        )
+    )
+
+
+def _verified_checksum_address(address: str) -> ChecksumAddress | None:
+    """
+    The EIP-55 form of a well-formed address, or None when the address is
+    mixed-case and its checksum is wrong. All-lowercase and all-uppercase
+    addresses carry no checksum and are accepted as is.
+    """
+    address_hex = address[2:]
+    address_hex_lower = address_hex.lower()
+    checksum_address = _checksum_address(address_hex_lower)
+
+    if (
+        address != checksum_address
+        and address_hex != address_hex_lower
+        and address_hex != address_hex.upper()
+    ):
+        return None
+
+    return checksum_address
+
+
+def validate_address(address: str) -> str:
+    if not ADDRESS_PATTERN.match(address):
+        raise ValueError("Invalid wallet address format")
+
+    if _verified_checksum_address(address) is None:
+        raise ValueError("Invalid address checksum")
+
+    return address
+
+
+def address_to_bytes(address: str) -> bytes:
+    return bytes.fromhex(validate_address(address)[2:])
+
+
+def bytes_to_checksum_address(address: bytes) -> ChecksumAddress:
+    return _checksum_address(address.hex())
+
+
+def format_units(value: int, decimals: int) -> str:
+    """
+    Scales an integer amount of base units to an exact decimal string,
+    e.g. format_units(1500000, 6) == "1.5".
+    """
+    sign = "-" if value < 0 else ""
+    whole, fraction = divmod(abs(value), 10**decimals)
+
+    if not fraction:
+        return f"{sign}{whole}"
+
+    return f"{sign}{whole}.{str(fraction).zfill(decimals).rstrip('0')}"
+
+
+def address_columns(address: str) -> Dict[str, Any]:
+    address_bytes = address_to_bytes(address)
+
+    return {
+        "address": address_bytes,
+        "checksum_address": bytes_to_checksum_address(address_bytes),
+    }
+
+
+def validate_addresses(
+    rows: Iterable[Tuple[int, Any]],
+) -> Tuple[List[ValidAddress], List[AddressError]]:
+    """
+    Validates a batch of (row number, address) pairs in one pass, with the same
+    rules as validate_address. Each valid address is hashed once and returned
+    with its checksum form.
+    """
+    valid_addresses: List[ValidAddress] = []
+    errors: List[AddressError] = []
+    match = ADDRESS_PATTERN.match
+
+    for row, address in rows:
+        if not isinstance(address, str) or not match(address):
+            errors.append(
+                AddressError(
+                    row,
+                    None if address is None else str(address),
+                    "Invalid wallet address format",
+                )
+            )
+            continue
+
+        checksum_address = _verified_checksum_address(address)
+
+        if checksum_address is None:
+            errors.append(AddressError(row, address, "Invalid address checksum"))
+            continue
+
+        valid_addresses.append(
+            ValidAddress(bytes.fromhex(address[2:]), checksum_address)
+        )
+
+    return valid_addresses, errors
@@ -0,0 +1,115 @@
+import os
+
+TEST_DB_URL = os.environ.get("TEST_DB_URL")
+
+if TEST_DB_URL:
+    # Must be set before the settings are imported for the first time
+    os.environ["DB__URL"] = TEST_DB_URL
+
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterator, List  # noqa: E402
+
+import pytest  # noqa: E402
+from auth.models import User  # noqa: E402
+from auth.services import TokenGenerator  # noqa: E402
+from auth.utils import hash_password  # noqa: E402
+from database import Base, async_session, engine  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from httpx import ASGITransport, AsyncClient  # noqa: E402
+from main import app as main_app  # noqa: E402
+from sqlalchemy import event, text  # noqa: E402
+
+USER_PASSWORD = "StrongPassword123!"
+
+
+@pytest.fixture(scope="session")
+async def database() -> AsyncIterator[None]:
+    if not TEST_DB_URL:
+        pytest.skip("TEST_DB_URL is not set")
+
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.drop_all)
+        await connection.run_sync(Base.metadata.create_all)
+
+    yield
+
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.drop_all)
+
+    await engine.dispose()
+
+
+@pytest.fixture
+async def clean_tables(database: None) -> AsyncIterator[None]:
+    yield
+
+    tables = ", ".join(table.name for table in Base.metadata.sorted_tables)
+
+    async with engine.begin() as connection:
+        await connection.execute(text(f"TRUNCATE {tables} RESTART IDENTITY CASCADE"))
+
+
+@pytest.fixture(scope="session")
+def app() -> FastAPI:
+    return main_app
+
+
+@pytest.fixture
+async def client(app: FastAPI, clean_tables: None) -> AsyncIterator[AsyncClient]:
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        yield client
+
+
+@pytest.fixture
+def statements(clean_tables: None) -> Iterator[List[str]]:
+    executed: List[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany) -> None:
+        executed.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+
+    yield executed
+
+    event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+
+@pytest.fixture
+def create_user(clean_tables: None) -> Callable[[str], Awaitable[User]]:
+    async def create(email: str) -> User:
+        async with async_session() as session:
+            user = User(
+                email=email,
+                password=hash_password(USER_PASSWORD),
+                is_active=True,
+                is_verified=True,
+            )
+            session.add(user)
+            await session.commit()
+
+        return user
+
+    return create
+
+
+@pytest.fixture
+def auth_headers() -> Callable[[User], Awaitable[Dict[str, str]]]:
+    async def headers(user: User) -> Dict[str, str]:
+        access_token = await TokenGenerator().generate_access_token(user.id, user.email)
+
+        return {"Authorization": f"Bearer {access_token.token}"}
+
+    return headers
+
+
+@pytest.fixture
+async def user(create_user: Callable[[str], Awaitable[User]]) -> User:
+    return await create_user("user@example.com")
+
+
+@pytest.fixture
+async def user_headers(
+    user: User, auth_headers: Callable[[User], Awaitable[Dict[str, str]]]
+) -> Dict[str, str]:
+    return await auth_headers(user)
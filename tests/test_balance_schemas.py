@@ -0,0 +1,16 @@
+from decimal import Decimal
+
+from wallets.schemas import WalletBalanceSchema
+
+
+def test_native_in_usd_is_exact_beyond_default_precision() -> None:
+    balance = WalletBalanceSchema(
+        address="0x52908400098527886E0F7030069857D2E4169EE7",
+        native_balance_raw=123456789012345678901234567890123,
+        native_decimals=18,
+        native_usd_price=Decimal("3456.789012345678901"),
+    )
+
+    assert balance.native_in_usd == (
+        "426764071757355282.318244417231822862699943607394823"
+    )
@@ -0,0 +1,39 @@
+from wallets.cache import BalanceTotalsCache
+
+TOTALS = {
+    "native_in_usd": 1.0,
+    "usdt_balance": 2.0,
+    "usdc_balance": 3.0,
+    "total_in_usd": 6.0,
+}
+
+
+def test_totals_of_different_chain_sets_are_kept_apart() -> None:
+    cache = BalanceTotalsCache(ttl_seconds=60, max_users=10)
+    all_chains = frozenset({"Ethereum", "BSC"})
+    ethereum = frozenset({"Ethereum"})
+
+    cache.set(1, all_chains, {None: TOTALS, 5: TOTALS})
+    cache.update(1, ethereum, 5, {**TOTALS, "total_in_usd": 1.0})
+
+    latest = cache.get(1)
+
+    assert latest[None].chains == all_chains
+    assert latest[5].chains == ethereum
+    assert latest[5].totals["total_in_usd"] == 1.0
+
+    cache.set(1, all_chains, {5: TOTALS})
+
+    latest = cache.get(1)
+
+    assert None not in latest
+    assert latest[5].chains == all_chains
+    assert latest[5].totals == TOTALS
+
+
+def test_expired_totals_are_dropped() -> None:
+    cache = BalanceTotalsCache(ttl_seconds=0, max_users=10)
+
+    cache.set(1, frozenset({"Ethereum"}), {None: TOTALS})
+
+    assert cache.get(1) == {}
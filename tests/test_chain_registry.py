@@ -0,0 +1,58 @@
+import os
+from pathlib import Path
+
+import yaml
+from wallets.chains import ChainRegistry
+
+
+def write_chains(path: Path, chains: dict, mtime_ns: int) -> None:
+    path.write_text(yaml.safe_dump({"chains": chains}))
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def chain(rpc: str, **extra: object) -> dict:
+    return {"currency": "ETH", "chain_logo": "logo.svg", "rpc": [rpc], **extra}
+
+
+async def test_reload_keeps_unchanged_chains_and_semaphores(tmp_path: Path) -> None:
+    path = tmp_path / "chains.yaml"
+    write_chains(
+        path,
+        {
+            "Ethereum": chain("https://eth.example"),
+            "Base": chain("https://base.example"),
+        },
+        mtime_ns=1_000_000_000,
+    )
+    registry = ChainRegistry(path, reload_interval_seconds=1, max_concurrent_requests=5)
+    ethereum = registry.get("Ethereum")
+    base = registry.get("Base")
+
+    write_chains(
+        path,
+        {
+            "Ethereum": chain("https://eth.example"),
+            "Base": chain("https://base.example", native_decimals=18),
+        },
+        mtime_ns=2_000_000_000,
+    )
+
+    assert await registry.reload_if_changed()
+    assert not await registry.reload_if_changed()
+
+    assert registry.get("Ethereum") is ethereum
+    assert registry.get("Base") is not base
+    assert registry.get("Base").semaphore is base.semaphore
+    assert registry.get("Base").rpc_endpoints == base.rpc_endpoints
+
+
+async def test_failed_reload_keeps_previous_chains(tmp_path: Path) -> None:
+    path = tmp_path / "chains.yaml"
+    write_chains(path, {"Ethereum": chain("https://eth.example")}, 1_000_000_000)
+    registry = ChainRegistry(path, reload_interval_seconds=1, max_concurrent_requests=5)
+
+    path.write_text("chains: [")
+    os.utime(path, ns=(2_000_000_000, 2_000_000_000))
+
+    assert not await registry.reload_if_changed()
+    assert "Ethereum" in registry
@@ -0,0 +1,72 @@
+import asyncio
+from typing import Dict
+
+from auth.models import User
+from conftest import USER_PASSWORD
+from database import async_session
+from httpx import AsyncClient
+from sqlalchemy import func, select
+from wallets.models import WalletGroup
+
+CONCURRENT_REQUESTS = 10
+
+
+async def test_concurrent_registrations_create_one_user(client: AsyncClient) -> None:
+    responses = await asyncio.gather(
+        *(
+            client.post(
+                "/api/auth/register/",
+                json={"email": "user@example.com", "password": USER_PASSWORD},
+            )
+            for _ in range(CONCURRENT_REQUESTS)
+        )
+    )
+
+    status_codes = sorted(response.status_code for response in responses)
+    assert status_codes == [201] + [409] * (CONCURRENT_REQUESTS - 1)
+
+    async with async_session() as session:
+        assert await session.scalar(select(func.count()).select_from(User)) == 1
+
+
+async def test_concurrent_wallet_groups_create_one_group(
+    client: AsyncClient, user_headers: Dict[str, str]
+) -> None:
+    responses = await asyncio.gather(
+        *(
+            client.post(
+                "/api/wallets/groups/",
+                json={"name": "Group 1", "color": "red"},
+                headers=user_headers,
+            )
+            for _ in range(CONCURRENT_REQUESTS)
+        )
+    )
+
+    status_codes = sorted(response.status_code for response in responses)
+    assert status_codes == [201] + [409] * (CONCURRENT_REQUESTS - 1)
+
+    async with async_session() as session:
+        assert await session.scalar(select(func.count()).select_from(WalletGroup)) == 1
+
+
+async def test_concurrent_imports_of_same_addresses_create_each_once(
+    client: AsyncClient, user_headers: Dict[str, str]
+) -> None:
+    addresses = [
+        {"address": "0x52908400098527886E0F7030069857D2E4169EE7"},
+        {"address": "0x8617E340B3D01FA5F11F306F4090FD50E238070D"},
+        {"address": "0xde709f2102306220921060314715629080e2fb77"},
+    ]
+
+    responses = await asyncio.gather(
+        *(
+            client.post("/api/wallets/", json=addresses, headers=user_headers)
+            for _ in range(CONCURRENT_REQUESTS)
+        )
+    )
+
+    assert all(response.status_code == 201 for response in responses)
+    assert sorted(
+        wallet["number"] for response in responses for wallet in response.json()
+    ) == [1, 2, 3]
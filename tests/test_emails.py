@@ -0,0 +1,16 @@
+from auth.emails import render_email
+
+LINK = "https://example.com/confirm?token=a&next=<b>"
+
+
+def test_link_is_escaped_only_in_html_part() -> None:
+    message = render_email(
+        "email_confirmation", "Confirm your email", "user@example.com", link=LINK
+    )
+
+    assert message["To"] == "user@example.com"
+    assert message.get_body(("plain",)).get_content().rstrip().endswith(LINK)
+    assert (
+        'href="https://example.com/confirm?token=a&amp;next=&lt;b&gt;"'
+        in message.get_body(("html",)).get_content()
+    )
@@ -0,0 +1,33 @@
+from typing import Dict
+
+from auth.models import User
+from conftest import USER_PASSWORD
+from database import engine, get_pool_metrics
+from httpx import AsyncClient
+
+
+async def test_wallets_request_checks_out_one_connection(
+    client: AsyncClient, user_headers: Dict[str, str]
+) -> None:
+    checkouts = get_pool_metrics(engine)["checkouts"]
+
+    response = await client.get("/api/wallets/", headers=user_headers)
+
+    assert response.status_code == 200
+    assert get_pool_metrics(engine)["checkouts"] - checkouts == 1
+
+
+async def test_login_checks_out_one_connection(client: AsyncClient, user: User) -> None:
+    checkouts = get_pool_metrics(engine)["checkouts"]
+
+    response = await client.post(
+        "/api/auth/login/",
+        json={
+            "email": user.email,
+            "password": USER_PASSWORD,
+            "user_details": {"fingerprint": "fingerprint"},
+        },
+    )
+
+    assert response.status_code == 200
+    assert get_pool_metrics(engine)["checkouts"] - checkouts == 1
@@ -0,0 +1,17 @@
+import pytest
+from auth.tasks import delete_expired_refresh_tokens
+from outbox.tasks import relay_outbox_messages
+
+pytestmark = pytest.mark.usefixtures("clean_tables")
+
+
+def test_relay_runs_on_consecutive_event_loops() -> None:
+    # Each run calls asyncio.run, so a connection kept from the first loop
+    # would fail on the second
+    assert relay_outbox_messages() == 0
+    assert relay_outbox_messages() == 0
+
+
+def test_refresh_token_cleanup_runs_on_consecutive_event_loops() -> None:
+    assert delete_expired_refresh_tokens() == 0
+    assert delete_expired_refresh_tokens() == 0
@@ -0,0 +1,53 @@
+import time
+from typing import Awaitable, Callable, Dict, List
+
+from auth.models import User
+from auth.utils import encode_jwt
+from database import async_session
+from httpx import AsyncClient
+from wallets.models import Wallet
+from wallets.utils import address_columns
+
+ADDRESS = "0x52908400098527886E0F7030069857D2E4169EE7"
+
+
+async def test_missing_scope_is_rejected_without_queries(
+    client: AsyncClient, user: User, statements: List[str]
+) -> None:
+    now = int(time.time())
+    access_token = encode_jwt(
+        {
+            "sub": user.id,
+            "email": user.email,
+            "scopes": ["wallets:read"],
+            "iat": now,
+            "exp": now + 60,
+        }
+    )
+    executed = len(statements)
+
+    response = await client.delete(
+        "/api/wallets/groups/1/", headers={"Authorization": f"Bearer {access_token}"}
+    )
+
+    assert response.status_code == 403
+    assert statements[executed:] == []
+
+
+async def test_foreign_wallet_is_not_found_after_one_query(
+    client: AsyncClient,
+    create_user: Callable[[str], Awaitable[User]],
+    user_headers: Dict[str, str],
+    statements: List[str],
+) -> None:
+    owner = await create_user("owner@example.com")
+    async with async_session() as session:
+        wallet = Wallet(number=1, user_id=owner.id, **address_columns(ADDRESS))
+        session.add(wallet)
+        await session.commit()
+    executed = len(statements)
+
+    response = await client.get(f"/api/wallets/{wallet.id}/", headers=user_headers)
+
+    assert response.status_code == 404
+    assert len(statements[executed:]) == 1
@@ -0,0 +1,51 @@
+from io import BytesIO
+from typing import Dict, List
+
+from httpx import AsyncClient, Response
+from openpyxl import Workbook
+
+ADDRESSES = [
+    "0x52908400098527886E0F7030069857D2E4169EE7",
+    "0x8617e340b3d01fa5f11f306f4090fd50e238070d",
+]
+
+
+def build_xlsx(cells: List[str | None]) -> bytes:
+    workbook = Workbook()
+    for cell in cells:
+        workbook.active.append([cell])
+
+    xlsx = BytesIO()
+    workbook.save(xlsx)
+
+    return xlsx.getvalue()
+
+
+async def post_xlsx(
+    client: AsyncClient, headers: Dict[str, str], cells: List[str | None]
+) -> Response:
+    return await client.post(
+        "/api/wallets/xlsx/",
+        files={"wallets_xlsx": ("wallets.xlsx", build_xlsx(cells))},
+        headers=headers,
+    )
+
+
+async def test_xlsx_header_row_is_skipped(
+    client: AsyncClient, user_headers: Dict[str, str]
+) -> None:
+    response = await post_xlsx(client, user_headers, ["Address", *ADDRESSES])
+
+    assert response.status_code == 201
+    assert [wallet["number"] for wallet in response.json()] == [1, 2]
+
+
+async def test_xlsx_invalid_address_is_reported_with_its_sheet_row(
+    client: AsyncClient, user_headers: Dict[str, str]
+) -> None:
+    response = await post_xlsx(
+        client, user_headers, ["Address", ADDRESSES[0], None, "0x1234"]
+    )
+
+    assert response.status_code == 422
+    assert [error["row"] for error in response.json()["detail"]] == [4]
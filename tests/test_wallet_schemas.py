@@ -0,0 +1,18 @@
+from typing import Type
+
+import pytest
+from pydantic import BaseModel, ValidationError
+from wallets.schemas import WalletPatchSchema, WalletPutSchema
+
+ADDRESS = "0x52908400098527886E0F7030069857D2E4169EE7"
+
+
+@pytest.mark.parametrize("schema", [WalletPutSchema, WalletPatchSchema])
+def test_mixed_case_address_with_bad_checksum_is_rejected(
+    schema: Type[BaseModel],
+) -> None:
+    schema(id=1, address=ADDRESS, group_id=None)
+    schema(id=1, address=ADDRESS.lower(), group_id=None)
+
+    with pytest.raises(ValidationError, match="Invalid address checksum"):
+        schema(id=1, address=ADDRESS.replace("EE7", "Ee7"), group_id=None)